@@ -4,32 +4,100 @@ This module provides a REST API for integration with an Electron front-end.
 """
 
 import os
-import json
-import uuid
+import time
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 
 from .news2 import FuzzyNEWS2, NEWS2Result
 from .utils import (
-    validate_range, 
+    validate_vitals,
     validate_consciousness,
-    format_result,
     save_result,
-    load_result,
-    get_patient_history
+    save_results,
+    append_assessment_log,
+    assessment_log_version,
+    history_index_version,
+    get_patient_history,
+    get_patient_history_arrays
 )
 
 
+# Worker processes for the CPU-bound NEWS-2 calculation, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Return the calculation process pool, creating it if needed.
+    
+    Workers are started by a fork server (or spawned where there is none)
+    rather than forked from the server, whose other threads may hold locks
+    at fork time. Each worker imports this module and so builds its own
+    fuzzy_news at import.
+    """
+    global _executor
+    if _executor is None:
+        start_method = (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        _executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _executor
+
+
+async def _run_in_executor(fn, *args):
+    """
+    Run a function in the calculation process pool, off the event loop.
+    
+    A worker that dies breaks the whole pool, so a broken pool is replaced
+    and the call retried once; the calculations are pure, so retrying is safe.
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        return await loop.run_in_executor(executor, fn, *args)
+    except BrokenProcessPool:
+        # Concurrent calls may all see the break; only the first replaces the pool
+        if _executor is executor:
+            executor.shutdown(wait=False)
+            _executor = None
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Shut down the calculation process pool with the app."""
+    global _executor
+    yield
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
 # Create the FastAPI app
 app = FastAPI(
     title="Fuzzy NEWS-2 API",
     description="API for fuzzy logic implementation of NEWS-2 score",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware for Electron integration
@@ -41,8 +109,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create the FuzzyNEWS2 instance
-fuzzy_news = FuzzyNEWS2()
+# Create the FuzzyNEWS2 instance, one per process including each pool
+# worker; _calc_cached memoizes its results
+fuzzy_news = FuzzyNEWS2(cache_size=0)
+
+
+@lru_cache(maxsize=65536)
+def _calc_cached(
+    respiratory_rate: int,
+    oxygen_saturation: int,
+    systolic_bp: int,
+    pulse: int,
+    consciousness: str,
+    temperature: float,
+    supplemental_oxygen: bool
+) -> NEWS2Result:
+    """
+    Calculate the NEWS-2 score, memoized on the vital signs.
+    
+    The calculation is a pure function of the vitals, so repeated vitals
+    skip the fuzzy inference entirely.
+    """
+    return fuzzy_news.calculate(
+        respiratory_rate=respiratory_rate,
+        oxygen_saturation=oxygen_saturation,
+        systolic_bp=systolic_bp,
+        pulse=pulse,
+        consciousness=consciousness,
+        temperature=temperature,
+        supplemental_oxygen=supplemental_oxygen
+    )
+
+
+def _calc_many(vitals_list: List[Tuple]) -> List[NEWS2Result]:
+    """Calculate NEWS-2 scores for several vital sign tuples in one call."""
+    return [_calc_cached(*vitals) for vitals in vitals_list]
+
+
+def _validate(vitals: "PatientVitals") -> None:
+    """Check a set of vital signs, raising ValueError if any is out of range."""
+    validate_vitals(
+        vitals.respiratory_rate,
+        vitals.oxygen_saturation,
+        vitals.systolic_bp,
+        vitals.pulse,
+        vitals.temperature
+    )
+    validate_consciousness(vitals.consciousness)
+
+
+def _vitals_tuple(vitals: "PatientVitals") -> Tuple:
+    """Return the arguments of _calc_cached for a set of vital signs."""
+    return (
+        vitals.respiratory_rate,
+        vitals.oxygen_saturation,
+        vitals.systolic_bp,
+        vitals.pulse,
+        vitals.consciousness,
+        vitals.temperature,
+        vitals.supplemental_oxygen
+    )
+
+
+# Last health check timestamp as (time.time(), ISO string), reused for up to
+# a second so frequent probes don't format a new one each time
+_last_health_timestamp: Tuple[float, str] = (0.0, "")
+
+
+def _health_timestamp() -> str:
+    """Return the current ISO timestamp at one-second granularity."""
+    global _last_health_timestamp
+    now = time.time()
+    if now - _last_health_timestamp[0] >= 1:
+        _last_health_timestamp = (now, datetime.fromtimestamp(now).isoformat())
+    return _last_health_timestamp[1]
+
+
+# Time-to-live (seconds) of cached read-endpoint responses
+HISTORY_CACHE_TTL = 60
+STATISTICS_CACHE_TTL = 300
+
+# Maximum number of patients with cached responses
+RESPONSE_CACHE_MAX_PATIENTS = 1024
+
+# Cached responses per patient, least recently used patient first:
+# {patient_id: {key: (stored_at, data_version, response)}}
+_response_cache: "OrderedDict[str, Dict[Tuple, Tuple[float, Any, Any]]]" = OrderedDict()
+
+
+def _get_cached_response(patient_id: str, key: Tuple, ttl: float,
+                         data_version: Any = None) -> Optional[Any]:
+    """
+    Return a cached response for a patient if it has not expired.
+    
+    The data version is that of the files the response was built from, so
+    writes by other processes, which don't invalidate this process's cache,
+    are still seen.
+    """
+    entry = _response_cache.get(patient_id, {}).get(key)
+    if entry is None or time.monotonic() - entry[0] > ttl or entry[1] != data_version:
+        return None
+    _response_cache.move_to_end(patient_id)
+    return entry[2]
+
+
+def _set_cached_response(patient_id: str, key: Tuple, response: Any,
+                         data_version: Any = None) -> None:
+    """Cache a response for a patient, evicting the least recently used patient when full."""
+    if patient_id not in _response_cache and len(_response_cache) >= RESPONSE_CACHE_MAX_PATIENTS:
+        _response_cache.popitem(last=False)
+    _response_cache.setdefault(patient_id, {})[key] = (time.monotonic(), data_version, response)
+    _response_cache.move_to_end(patient_id)
+
+
+def _invalidate_cached_responses(patient_id: str) -> None:
+    """Drop all cached responses for a patient, e.g. after a new assessment."""
+    _response_cache.pop(patient_id, None)
 
 
 class PatientVitals(BaseModel):
@@ -56,29 +238,13 @@ class PatientVitals(BaseModel):
     temperature: float = Field(..., description="Body temperature (°C)")
     supplemental_oxygen: bool = Field(False, description="Whether supplemental oxygen is being used")
     
-    @validator("respiratory_rate")
-    def validate_respiratory_rate(cls, v):
-        return validate_range(v, 0, 50, "Respiratory rate")
-    
-    @validator("oxygen_saturation")
-    def validate_oxygen_saturation(cls, v):
-        return validate_range(v, 70, 100, "Oxygen saturation")
-    
-    @validator("systolic_bp")
-    def validate_systolic_bp(cls, v):
-        return validate_range(v, 50, 250, "Systolic blood pressure")
-    
-    @validator("pulse")
-    def validate_pulse(cls, v):
-        return validate_range(v, 20, 180, "Pulse rate")
-    
-    @validator("consciousness")
-    def validate_consciousness_level(cls, v):
-        return validate_consciousness(v)
-    
-    @validator("temperature")
-    def validate_temperature(cls, v):
-        return validate_range(v, 33.0, 43.0, "Temperature")
+    # Ranges and consciousness levels are checked by the endpoints in one
+    # pass (see _validate), so out-of-range values are rejected with a 400
+
+
+class BatchRequest(BaseModel):
+    """Model for a batch of patient vital signs."""
+    vitals: List[PatientVitals] = Field(..., description="Vital signs to assess")
 
 
 class NEWS2Response(BaseModel):
@@ -104,29 +270,28 @@ async def calculate_news2(vitals: PatientVitals):
         NEWS2Response: NEWS-2 score and recommendations
     """
     try:
-        result = fuzzy_news.calculate(
-            respiratory_rate=vitals.respiratory_rate,
-            oxygen_saturation=vitals.oxygen_saturation,
-            systolic_bp=vitals.systolic_bp,
-            pulse=vitals.pulse,
-            consciousness=vitals.consciousness,
-            temperature=vitals.temperature,
-            supplemental_oxygen=vitals.supplemental_oxygen
-        )
+        _validate(vitals)
+        
+        # Run the calculation off the event loop
+        result = await _run_in_executor(_calc_cached, *_vitals_tuple(vitals))
         
         # Format the result
+        now = datetime.now()
         response = {
             "patient_id": vitals.patient_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "crisp_score": result.crisp_score,
             "fuzzy_score": result.fuzzy_score,
             "risk_category": result.risk_category,
             "recommended_response": result.recommended_response,
-            "parameter_scores": result.parameter_scores
+            "parameter_scores": result.parameter_scores.to_dict()
         }
         
-        # Save the result
-        save_result(response, vitals.patient_id)
+        # Save the result, with the epoch so statistics needn't parse it
+        record = {**response, "ts_epoch": now.timestamp()}
+        save_result(record, vitals.patient_id)
+        append_assessment_log([record], vitals.patient_id)
+        _invalidate_cached_responses(vitals.patient_id)
         
         return response
     
@@ -137,8 +302,72 @@ async def calculate_news2(vitals: PatientVitals):
         raise HTTPException(status_code=500, detail=f"Error calculating NEWS-2 score: {str(e)}")
 
 
-@app.get("/api/history/{patient_id}", response_model=List[NEWS2Response])
-async def get_history(patient_id: str, limit: int = Query(10, ge=1, le=100)):
+@app.post("/api/calculate_batch", response_model=List[NEWS2Response])
+async def calculate_news2_batch(batch: BatchRequest):
+    """
+    Calculate NEWS-2 scores for a batch of vital signs.
+    
+    Results for the same patient are saved together in a single file.
+    
+    Args:
+        batch: Vital signs to assess
+    
+    Returns:
+        List of NEWS2Response, in the same order as the input
+    """
+    try:
+        for vitals in batch.vitals:
+            _validate(vitals)
+        
+        # Run the whole batch in one worker call, off the event loop
+        results = await _run_in_executor(
+            _calc_many, [_vitals_tuple(vitals) for vitals in batch.vitals]
+        )
+        
+        responses = []
+        by_patient: Dict[str, List[Dict]] = {}
+        
+        for vitals, result in zip(batch.vitals, results):
+            now = datetime.now()
+            response = {
+                "patient_id": vitals.patient_id,
+                "timestamp": now.isoformat(),
+                "crisp_score": result.crisp_score,
+                "fuzzy_score": result.fuzzy_score,
+                "risk_category": result.risk_category,
+                "recommended_response": result.recommended_response,
+                "parameter_scores": result.parameter_scores.to_dict()
+            }
+            responses.append(response)
+            by_patient.setdefault(vitals.patient_id, []).append(
+                {**response, "ts_epoch": now.timestamp()}
+            )
+        
+        # Save the results, one file per patient
+        for patient_id, patient_results in by_patient.items():
+            save_results(patient_results, patient_id)
+            append_assessment_log(patient_results, patient_id)
+            _invalidate_cached_responses(patient_id)
+        
+        return responses
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating NEWS-2 scores: {str(e)}")
+
+
+# Fields returned for each stored assessment in history responses
+HISTORY_FIELDS = tuple(NEWS2Response.model_fields)
+
+
+@app.get(
+    "/api/history/{patient_id}",
+    response_model=None,
+    responses={200: {"model": List[NEWS2Response], "description": "Assessment history"}},
+)
+async def get_history(patient_id: str, limit: int = Query(10, ge=1, le=100)) -> ORJSONResponse:
     """
     Get the history of assessments for a patient.
     
@@ -150,8 +379,19 @@ async def get_history(patient_id: str, limit: int = Query(10, ge=1, le=100)):
         List of assessment results
     """
     try:
-        history = get_patient_history(patient_id)
-        return history[:limit]
+        key = ("history", limit)
+        version = history_index_version(patient_id)
+        history = _get_cached_response(patient_id, key, HISTORY_CACHE_TTL, version)
+        if history is None:
+            history = [
+                {field: assessment[field] for field in HISTORY_FIELDS if field in assessment}
+                for assessment in get_patient_history(patient_id)[:limit]
+            ]
+            _set_cached_response(patient_id, key, history, version)
+        
+        # Stored assessments are trusted and already in the response shape,
+        # so they are not re-validated; the schema is only documented
+        return ORJSONResponse(content=history)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving history: {str(e)}")
@@ -170,18 +410,33 @@ async def get_statistics(patient_id: str, days: int = Query(7, ge=1, le=365)):
         Statistics for the patient
     """
     try:
-        history = get_patient_history(patient_id)
+        # Check the log version so appends by other processes are seen; a
+        # cached response also lapses once its oldest assessment leaves the
+        # window (see valid_until below)
+        key = ("statistics", days)
+        version = assessment_log_version(patient_id)
+        cached = _get_cached_response(patient_id, key, STATISTICS_CACHE_TTL, version)
+        if cached is not None and time.time() < cached[1]:
+            return cached[0]
+        
+        history = get_patient_history_arrays(patient_id)
         
         # Filter to only include the last 'days' days
-        cutoff = datetime.now().timestamp() - (days * 24 * 60 * 60)
-        recent_history = [
-            assessment for assessment in history
-            if datetime.fromisoformat(assessment["timestamp"]).timestamp() > cutoff
-        ]
+        window = days * 24 * 60 * 60
+        cutoff = time.time() - window
+        mask = history["timestamp"] > cutoff
+        crisp_scores = history["crisp_score"][mask]
+        fuzzy_scores = history["fuzzy_score"][mask]
+        
+        # When the oldest assessment in the window drops out of it
+        valid_until = (
+            float(history["timestamp"][mask].min()) + window if crisp_scores.size
+            else float("inf")
+        )
         
         # Calculate statistics
-        if not recent_history:
-            return {
+        if not crisp_scores.size:
+            statistics = {
                 "patient_id": patient_id,
                 "days": days,
                 "assessments_count": 0,
@@ -191,14 +446,13 @@ async def get_statistics(patient_id: str, days: int = Query(7, ge=1, le=365)):
                 "max_fuzzy_score": None,
                 "trend": "No data available"
             }
+            _set_cached_response(patient_id, key, (statistics, valid_until), version)
+            return statistics
         
-        crisp_scores = [assessment["crisp_score"] for assessment in recent_history]
-        fuzzy_scores = [assessment["fuzzy_score"] for assessment in recent_history]
-        
-        # Determine trend
-        if len(recent_history) >= 2:
-            first_score = recent_history[-1]["crisp_score"]
-            last_score = recent_history[0]["crisp_score"]
+        # Determine trend (history is ordered newest first)
+        if crisp_scores.size >= 2:
+            first_score = crisp_scores[-1]
+            last_score = crisp_scores[0]
             
             if last_score < first_score:
                 trend = "Improving"
@@ -209,16 +463,18 @@ async def get_statistics(patient_id: str, days: int = Query(7, ge=1, le=365)):
         else:
             trend = "Not enough data"
         
-        return {
+        statistics = {
             "patient_id": patient_id,
             "days": days,
-            "assessments_count": len(recent_history),
-            "average_crisp_score": sum(crisp_scores) / len(crisp_scores),
-            "average_fuzzy_score": sum(fuzzy_scores) / len(fuzzy_scores),
-            "max_crisp_score": max(crisp_scores),
-            "max_fuzzy_score": max(fuzzy_scores),
+            "assessments_count": int(crisp_scores.size),
+            "average_crisp_score": float(crisp_scores.mean()),
+            "average_fuzzy_score": float(fuzzy_scores.mean()),
+            "max_crisp_score": int(crisp_scores.max()),
+            "max_fuzzy_score": float(fuzzy_scores.max()),
             "trend": trend
         }
+        _set_cached_response(patient_id, key, (statistics, valid_until), version)
+        return statistics
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving statistics: {str(e)}")
@@ -235,7 +491,7 @@ async def health_check():
     return {
         "status": "healthy",
         "version": "0.1.0",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _health_timestamp()
     }
 
 
@@ -3,8 +3,15 @@ Custom fuzzy logic implementation that works with Python 3.12.
 This module replaces the scikit-fuzzy dependency.
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Callable, Tuple, Union, Optional
+from numpy.typing import DTypeLike
+from typing import Dict, Iterable, List, Callable, Tuple, Union, Optional
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the pure Python/NumPy paths
+    njit = None
 
 
 class FuzzyTerm:
@@ -19,6 +26,7 @@ class FuzzyTerm:
         """
         self.variable = variable
         self.term_name = term_name
+        self.term_id = variable.term_ids[term_name]
     
     def __and__(self, other):
         """Implement the AND operation between terms.
@@ -49,27 +57,148 @@ class AndTerms:
 class FuzzyVariable:
     """Represents a fuzzy variable with membership functions."""
     
-    def __init__(self, name: str, universe: np.ndarray):
+    def __init__(self, name: str, universe: np.ndarray, dtype: DTypeLike = np.float32):
         """Initialize a fuzzy variable.
         
         Args:
             name: Name of the variable
             universe: Universe of discourse (array of possible values)
+            dtype: Floating point type of the universe and term curves
         """
         self.name = name
-        self.universe = universe
+        # Single precision by default halves the memory traffic of
+        # defuzzification, which is plenty for the clinical ranges the
+        # universes cover
+        self.universe = np.ascontiguousarray(universe, dtype=dtype)
         self.terms = {}
+        self.term_ids = {}
+        self.term_curves = {}
+        self.term_centroids = {}
+        self._curve_matrix = None
+        self._centroid_vector = None
+        self._mf_blocks = None
+        # Bumped by every add_term, so engines can tell when code generated
+        # from the terms' membership functions is stale
+        self.terms_version = 0
     
     def add_term(self, name: str, mf_func: Callable[[np.ndarray], np.ndarray]):
         """Add a linguistic term with its membership function.
         
+        The membership function is evaluated once over the universe and the
+        resulting curve is cached for defuzzification.
+        
         Args:
             name: Name of the linguistic term
             mf_func: Membership function
         """
+        curve = np.ascontiguousarray(mf_func(self.universe), dtype=self.universe.dtype)
+        total = curve.sum()
+        
         self.terms[name] = mf_func
+        # Ids follow insertion order; replacing a term keeps its id
+        self.term_ids.setdefault(name, len(self.term_ids))
+        self.term_curves[name] = curve
+        # Centroid of the unclipped curve, which is the defuzzified value
+        # whenever this term alone fires at full strength
+        self.term_centroids[name] = (
+            float(self.universe @ curve / total) if total > 0
+            else float(np.mean(self.universe))
+        )
+        self._curve_matrix = None
+        self._centroid_vector = None
+        self._mf_blocks = None
+        self.terms_version += 1
         return self
     
+    @property
+    def curve_matrix(self) -> np.ndarray:
+        """Cached term curves stacked as an array of shape [n_terms, n_universe]."""
+        if self._curve_matrix is None:
+            self._curve_matrix = np.vstack(list(self.term_curves.values()))
+        return self._curve_matrix
+    
+    @property
+    def centroid_vector(self) -> List[float]:
+        """Cached full-curve term centroids, in term order."""
+        if self._centroid_vector is None:
+            self._centroid_vector = list(self.term_centroids.values())
+        return self._centroid_vector
+    
+    @property
+    def mf_blocks(self) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, Callable]]]:
+        """Membership function kinds and parameters of all terms as arrays.
+        
+        Returns:
+            Tuple of an int8 array of kernel kinds (-1 for terms without a
+            built-in kernel), a float64 array of parameters padded to shape
+            [n_terms, 4], both in term order, and the (index, function) pairs
+            of the terms without a built-in kernel
+        """
+        if self._mf_blocks is None:
+            kinds = np.full(len(self.terms), -1, dtype=np.int8)
+            params = np.zeros((len(self.terms), 4), dtype=np.float64)
+            custom = []
+            for i, mf_func in enumerate(self.terms.values()):
+                kind = _MF_KINDS.get(getattr(mf_func, "kernel", None), -1)
+                if kind >= 0:
+                    kinds[i] = kind
+                    params[i, :len(mf_func.params)] = mf_func.params
+                else:
+                    custom.append((i, mf_func))
+            self._mf_blocks = (kinds, params, custom)
+        return self._mf_blocks
+    
+    def fuzzify(self, x: float) -> np.ndarray:
+        """Evaluate the membership of every term at a single value.
+        
+        Args:
+            x: Input value
+        
+        Returns:
+            Membership degree of each term, in term order
+        """
+        if njit is None or not isinstance(x, (int, float)):
+            return np.array(
+                [float(mf_func(x)) for mf_func in self.terms.values()],
+                dtype=np.float64,
+            )
+        
+        # One compiled pass over the parameter block, then any custom
+        # membership functions in Python
+        kinds, params, custom = self.mf_blocks
+        memberships = _fuzzify_block(x, kinds, params)
+        for i, mf_func in custom:
+            memberships[i] = float(mf_func(x))
+        return memberships
+    
+    def fuzzify_many(self, x: np.ndarray) -> np.ndarray:
+        """Evaluate the membership of every term at an array of values.
+        
+        Args:
+            x: 1-D array of input values
+        
+        Returns:
+            Array of shape [len(x), n_terms] with the membership degrees of
+            each value, terms in term order
+        """
+        # One vectorized evaluation per term. Built-in kernels are evaluated
+        # with the scalar kernels' edge handling, so each value gets the
+        # memberships fuzzify() would give it; other membership functions
+        # take arrays (add_term evaluates them over the universe)
+        x = np.array(x, dtype=np.float64)
+        kinds, params, _ = self.mf_blocks
+        memberships = np.empty((len(x), len(self.terms)), dtype=np.float64)
+        for i, (kind, mf_func) in enumerate(zip(kinds.tolist(), self.terms.values())):
+            if kind == 0:
+                memberships[:, i] = _trimf_where(x, *params[i, :3].tolist())
+            elif kind == 1:
+                memberships[:, i] = _trapmf_where(x, *params[i].tolist())
+            elif kind == 2:
+                memberships[:, i] = _gaussmf_fused(x, *params[i, :2].tolist())
+            else:
+                memberships[:, i] = mf_func(x)
+        return memberships
+    
     def __getitem__(self, term_name):
         """Make the variable subscriptable to access terms.
         
@@ -104,23 +233,53 @@ class FuzzyRule:
 class CustomFuzzyLogic:
     """Custom fuzzy logic implementation."""
     
-    def __init__(self):
-        """Initialize the fuzzy logic system."""
+    DEFUZZIFICATION_METHODS = ("centroid", "weighted_average")
+    
+    def __init__(self, defuzzification: str = "centroid"):
+        """Initialize the fuzzy logic system.
+        
+        Args:
+            defuzzification: "centroid" for Mamdani centroid defuzzification
+                over the output universe, or "weighted_average" for the
+                Sugeno-style average of each output term's centroid weighted
+                by its activation
+        
+        Raises:
+            ValueError: If the defuzzification method is unknown
+        """
+        if defuzzification not in self.DEFUZZIFICATION_METHODS:
+            raise ValueError(f"Unknown defuzzification method: {defuzzification}")
+        
         self.variables = {}
         self.rules = []
+        self.defuzzification = defuzzification
+        self._defuzzify = (
+            self._defuzzify_centroid if defuzzification == "centroid"
+            else self._defuzzify_weighted_average
+        )
+        self._defuzzify_many = (
+            self._defuzzify_centroid_batch if defuzzification == "centroid"
+            else self._defuzzify_weighted_average_batch
+        )
+        self._compiled = None
+        self._specialized = None
     
-    def create_variable(self, name: str, universe: np.ndarray) -> FuzzyVariable:
+    def create_variable(self, name: str, universe: np.ndarray,
+                        dtype: DTypeLike = np.float32) -> FuzzyVariable:
         """Create a fuzzy variable.
         
         Args:
             name: Name of the variable
             universe: Universe of discourse
+            dtype: Floating point type of the universe and term curves
         
         Returns:
             The created FuzzyVariable
         """
-        variable = FuzzyVariable(name, universe)
+        variable = FuzzyVariable(name, universe, dtype)
         self.variables[name] = variable
+        self._compiled = None
+        self._specialized = None
         return variable
     
     def add_rule(self, if_part: Dict[str, str], then_part: Tuple[str, str]) -> FuzzyRule:
@@ -152,122 +311,643 @@ class CustomFuzzyLogic:
         
         rule = FuzzyRule(antecedent, (consequent_var, consequent_term_name))
         self.rules.append(rule)
+        self._compiled = None
+        self._specialized = None
         return rule
     
-    def compute(self, inputs: Dict[str, float]) -> Dict[str, float]:
-        """Compute the fuzzy inference.
+    def _term_layout(self) -> Tuple[int, ...]:
+        """Return the terms version of every variable, used to detect stale compilations.
         
-        Args:
-            inputs: Dictionary mapping variable names to input values
+        The version changes whenever a term is added or replaced, so the
+        membership parameters inlined by compile_specialized are covered
+        as well as the number of terms.
+        """
+        return tuple(var.terms_version for var in self.variables.values())
+    
+    def _compile(self):
+        """Freeze the rules into index arrays over a flat membership vector.
         
-        Returns:
-            Dictionary mapping output variable names to defuzzified values
+        Rules are first packed into an int16 table with one row per rule:
+        (variable id, term id) pairs for the antecedents, padded with -1,
+        followed by the consequent's pair. Variable ids are positions in
+        self.variables and term ids positions in each variable's terms.
+        
+        Every (variable, term) pair then gets a slot in a flat array, at its
+        variable's offset plus its term id, so each rule becomes a row of
+        antecedent slots padded with -1 and a consequent slot. Rules without
+        antecedents never activate and are dropped. For compute() the rows
+        are also flattened, grouped by consequent slot, into segments that
+        np.minimum.reduceat and np.maximum.reduceat fire in one call each.
         """
-        # Fuzzify inputs
-        fuzzified = {}
-        for var_name, value in inputs.items():
+        var_ids = {var_name: i for i, var_name in enumerate(self.variables)}
+        term_counts = np.array(
+            [len(var.terms) for var in self.variables.values()], dtype=np.int32
+        )
+        var_offsets = np.concatenate(([0], np.cumsum(term_counts)[:-1])).astype(np.int32)
+        offsets = dict(zip(self.variables, var_offsets.tolist()))
+        n_slots = int(term_counts.sum())
+        
+        rules = [rule for rule in self.rules if rule.antecedent]
+        max_antecedents = max((len(rule.antecedent) for rule in rules), default=0)
+        
+        rule_table = np.full((len(rules), 2 * max_antecedents + 2), -1, dtype=np.int16)
+        antecedent_vars = set()
+        for i, rule in enumerate(rules):
+            row = []
+            for var_name, (_, term_name) in rule.antecedent.items():
+                row += (var_ids[var_name], self.variables[var_name].term_ids[term_name])
+                antecedent_vars.add(var_name)
+            rule_table[i, :len(row)] = row
+            consequent_var, consequent_term = rule.consequent
+            rule_table[i, -2:] = (
+                var_ids[consequent_var.name],
+                self.variables[consequent_var.name].term_ids[consequent_term],
+            )
+        
+        # Resolve (variable, term) pairs to flat slots in one pass
+        ant_vars = rule_table[:, 0:-2:2].astype(np.int32)
+        ant_terms = rule_table[:, 1:-2:2].astype(np.int32)
+        ant_idx = np.where(ant_vars >= 0, var_offsets[ant_vars] + ant_terms, -1)
+        cons_idx = var_offsets[rule_table[:, -2]] + rule_table[:, -1]
+        
+        # Segment layout for firing every rule with reduceat: the rules'
+        # antecedent slots back to back, grouped by consequent slot, with
+        # the start of each rule's and each consequent's segment
+        order = np.argsort(cons_idx, kind="stable")
+        ant_counts = (ant_idx[order] >= 0).sum(axis=1)
+        flat_ant = ant_idx[order][ant_idx[order] >= 0]
+        rule_offsets = np.concatenate(([0], np.cumsum(ant_counts)[:-1]))
+        cons_slots, cons_offsets = np.unique(cons_idx[order], return_index=True)
+        
+        self._compiled = {
+            "layout": self._term_layout(),
+            "offsets": offsets,
+            "n_slots": n_slots,
+            "rule_table": rule_table,
+            "ant_idx": ant_idx.astype(np.int32),
+            "cons_idx": cons_idx.astype(np.int32),
+            "flat_ant": flat_ant.astype(np.int32),
+            "rule_offsets": rule_offsets.astype(np.int32),
+            "cons_slots": cons_slots.astype(np.int32),
+            "cons_offsets": cons_offsets.astype(np.int32),
+            "antecedent_vars": antecedent_vars,
+        }
+        return self._compiled
+    
+    def compile_specialized(self, input_names: List[str],
+                            input_grids: Optional[Dict[str, Iterable[float]]] = None):
+        """Generate straight-line inference code for a fixed set of inputs.
+        
+        The current variables and rules are emitted as a Python function
+        over scalar locals: one membership evaluation per input term, one
+        min() per rule and one max() per consequent term. Membership
+        functions made by the create_* factories are inlined as direct
+        kernel calls with constant parameters. compute() uses the generated
+        function whenever it is called with exactly these inputs, until a
+        variable, rule or term is added or a term is replaced.
+        
+        Inputs with a grid of expected values are fuzzified once per grid
+        value up front; the generated function looks those memberships up
+        and only evaluates the membership functions for other values.
+        
+        Args:
+            input_names: Names of the input variables, in any order
+            input_grids: Optional dictionary mapping input names to the
+                exact values to precompute memberships for
+        """
+        compiled = self._compile()
+        offsets = compiled["offsets"]
+        input_names = list(input_names)
+        
+        for var_name in input_names:
             if var_name not in self.variables:
                 raise ValueError(f"Unknown input variable: {var_name}")
-            
-            var = self.variables[var_name]
-            fuzzified[var_name] = {}
-            
-            for term_name, mf_func in var.terms.items():
-                # Evaluate membership function at the input value
-                membership = self._evaluate_mf(mf_func, value)
-                fuzzified[var_name][term_name] = membership
+        missing = compiled["antecedent_vars"].difference(input_names)
+        if missing:
+            raise ValueError(f"Missing input variables: {sorted(missing)}")
         
-        # Initialize output aggregation
-        output_aggregation = {}
-        for var_name, var in self.variables.items():
-            # Skip input variables
-            if var_name in inputs:
+        namespace = {"_np": np, "_defuzzify": self._defuzzify}
+        args = [f"x{i}" for i in range(len(input_names))]
+        lines = [f"def _run({', '.join(args)}):"]
+        
+        # Fuzzify inputs
+        input_grids = input_grids or {}
+        grids = {}
+        for arg, var_name in zip(args, input_names):
+            offset = offsets[var_name]
+            evaluators = []
+            fuzzify = []
+            for i, mf_func in enumerate(self.variables[var_name].terms.values()):
+                slot = offset + i
+                kernel = getattr(mf_func, "kernel", None)
+                if kernel is not None:
+                    params = tuple(float(p) for p in mf_func.params)
+                    namespace[f"_k{slot}"] = kernel
+                    evaluators.append(lambda x, kernel=kernel, params=params: kernel(x, *params))
+                    fuzzify.append(f"m{slot} = _k{slot}({arg}, {', '.join(map(repr, params))})")
+                else:
+                    namespace[f"_f{slot}"] = mf_func
+                    evaluators.append(lambda x, mf_func=mf_func: float(mf_func(x)))
+                    fuzzify.append(f"m{slot} = float(_f{slot}({arg}))")
+            
+            if var_name not in input_grids:
+                lines.extend(f"    {line}" for line in fuzzify)
                 continue
             
-            # Initialize output aggregation for this variable
-            output_aggregation[var_name] = {}
-            for term_name in var.terms:
-                output_aggregation[var_name][term_name] = 0.0
+            # Memberships at the grid values, evaluated exactly as the
+            # generated code would
+            namespace[f"_lut{offset}"] = lut = {
+                value: tuple(evaluate(value) for evaluate in evaluators)
+                for value in input_grids[var_name]
+            }
+            if lut:
+                # The same table as sorted arrays, for batch lookups
+                grid_values = sorted(lut)
+                grids[var_name] = (
+                    np.array(grid_values, dtype=np.float64),
+                    np.array([lut[value] for value in grid_values], dtype=np.float64)
+                    .reshape(len(grid_values), len(evaluators)),
+                )
+            slots = ", ".join(f"m{offset + i}" for i in range(len(evaluators)))
+            lines.append(f"    row = _lut{offset}.get({arg})")
+            lines.append("    if row is None:")
+            lines.extend(f"        {line}" for line in fuzzify)
+            lines.append("    else:")
+            lines.append(f"        {slots}, = row")
         
         # Evaluate rules
-        for rule in self.rules:
-            # Calculate rule activation (minimum of all antecedent memberships)
-            antecedent_degrees = []
-            for var_name, (_, term_name) in rule.antecedent.items():
-                antecedent_degrees.append(fuzzified[var_name][term_name])
+        fired = {}
+        for r, (ant_row, cons_slot) in enumerate(zip(compiled["ant_idx"], compiled["cons_idx"])):
+            terms = [f"m{slot}" for slot in ant_row if slot >= 0]
+            lines.append(
+                f"    a{r} = min({', '.join(terms)})" if len(terms) > 1
+                else f"    a{r} = {terms[0]}"
+            )
+            fired.setdefault(int(cons_slot), []).append(f"a{r}")
+        
+        # Aggregate and defuzzify outputs
+        outputs = []
+        for var_name, var in self.variables.items():
+            if var_name in input_names:
+                continue
             
-            rule_activation = min(antecedent_degrees) if antecedent_degrees else 0.0
+            offset = offsets[var_name]
+            term_activations = []
+            for slot in range(offset, offset + len(var.terms)):
+                if slot in fired:
+                    term_activations.append(f"max(0.0, {', '.join(fired[slot])})")
+                else:
+                    term_activations.append("0.0")
             
-            # Apply rule activation to consequent
-            consequent_var, consequent_term = rule.consequent
-            var_name = consequent_var.name
+            namespace[f"_v{offset}"] = var
+            lines.append(f"    t{offset} = ({', '.join(term_activations)},)")
+            lines.append(
+                f"    o{offset} = _defuzzify(_v{offset}, _np.array(t{offset})) "
+                f"if any(t{offset}) else 0.0"
+            )
+            outputs.append(f"{var_name!r}: o{offset}")
+        
+        lines.append(f"    return {{{', '.join(outputs)}}}")
+        
+        exec(compile("\n".join(lines), f"<fuzzy rulebase {id(self):#x}>", "exec"), namespace)
+        self._specialized = (
+            compiled["layout"], frozenset(input_names), input_names, namespace["_run"], grids
+        )
+        return namespace["_run"]
+    
+    def compute(self, inputs: Dict[str, Union[float, np.ndarray]]
+                ) -> Dict[str, Union[float, np.ndarray]]:
+        """Compute the fuzzy inference.
+        
+        Args:
+            inputs: Dictionary mapping variable names to input values, or to
+                equal-length arrays of values to compute several cases at once
+        
+        Returns:
+            Dictionary mapping output variable names to defuzzified values,
+            as arrays when the inputs are arrays
+        """
+        specialized = self._specialized
+        if specialized is not None and specialized[1] == inputs.keys():
+            layout, _, input_names, run, _ = specialized
+            values = [inputs[var_name] for var_name in input_names]
+            if (layout == self._term_layout()
+                    and all(isinstance(value, (int, float)) for value in values)):
+                return run(*values)
+        
+        compiled = self._compiled
+        if compiled is None or compiled["layout"] != self._term_layout():
+            compiled = self._compile()
+        
+        if any(isinstance(value, np.ndarray) for value in inputs.values()):
+            return self._compute_batch(inputs, compiled)
+        
+        offsets = compiled["offsets"]
+        
+        # Fuzzify inputs into a flat membership vector
+        memberships = np.zeros(compiled["n_slots"], dtype=np.float64)
+        for var_name, value in inputs.items():
+            if var_name not in self.variables:
+                raise ValueError(f"Unknown input variable: {var_name}")
             
-            # Use maximum aggregation method
-            output_aggregation[var_name][consequent_term] = max(
-                output_aggregation[var_name][consequent_term],
-                rule_activation
+            var = self.variables[var_name]
+            offset = offsets[var_name]
+            memberships[offset:offset + len(var.terms)] = var.fuzzify(value)
+        
+        missing = compiled["antecedent_vars"].difference(inputs)
+        if missing:
+            raise ValueError(f"Missing input variables: {sorted(missing)}")
+        
+        # Evaluate rules: activation is the minimum of the antecedent
+        # memberships, aggregated per consequent term using maximum; both
+        # are one segmented reduction over all rules
+        activations = np.zeros(compiled["n_slots"], dtype=np.float64)
+        if len(compiled["cons_slots"]):
+            rule_activations = np.minimum.reduceat(
+                memberships[compiled["flat_ant"]], compiled["rule_offsets"]
+            )
+            activations[compiled["cons_slots"]] = np.maximum.reduceat(
+                rule_activations, compiled["cons_offsets"]
             )
         
         # Defuzzify outputs
         defuzzified = {}
-        for var_name, term_activations in output_aggregation.items():
-            var = self.variables[var_name]
+        for var_name, var in self.variables.items():
+            # Skip input variables
+            if var_name in inputs:
+                continue
+            
+            offset = offsets[var_name]
+            term_activations = activations[offset:offset + len(var.terms)]
             
             # Skip if no rules activated this output
-            if not any(term_activations.values()):
+            if not term_activations.any():
                 defuzzified[var_name] = 0.0
                 continue
             
-            # Defuzzify using centroid method
-            defuzzified[var_name] = self._defuzzify_centroid(
-                var, term_activations
-            )
+            defuzzified[var_name] = self._defuzzify(var, term_activations)
         
         return defuzzified
     
-    def _evaluate_mf(self, mf_func: Callable, x: float) -> float:
-        """Evaluate a membership function at a specific point.
+    def _compute_batch(self, inputs: Dict[str, np.ndarray],
+                       compiled: dict) -> Dict[str, np.ndarray]:
+        """Compute the fuzzy inference for arrays of inputs.
+        
+        Every step works on all cases at once: each input column is
+        fuzzified with one vectorized call per term (or one gather from
+        the compile_specialized grid tables, for values on the grid), the
+        rules fire in one pair of reductions over a [cases, slots]
+        membership matrix, and each output is defuzzified over a
+        [cases, universe] aggregate. Results match compute() for each case
+        up to the rounding of the universe's dtype.
         
         Args:
-            mf_func: Membership function
-            x: Input value
+            inputs: Dictionary mapping variable names to arrays of input
+                values, or to scalars shared by every case
+            compiled: Result of _compile()
         
         Returns:
-            Membership degree
+            Dictionary mapping output variable names to arrays of
+            defuzzified values
         """
-        return float(mf_func(x))
+        offsets = compiled["offsets"]
+        columns = {}
+        for var_name, value in inputs.items():
+            if var_name not in self.variables:
+                raise ValueError(f"Unknown input variable: {var_name}")
+            columns[var_name] = np.atleast_1d(np.asarray(value, dtype=np.float64))
+        
+        missing = compiled["antecedent_vars"].difference(inputs)
+        if missing:
+            raise ValueError(f"Missing input variables: {sorted(missing)}")
+        
+        n_cases = max(len(column) for column in columns.values())
+        
+        # Grid tables of specialized code that is still current
+        specialized = self._specialized
+        grids = (
+            specialized[4] if specialized is not None and specialized[0] == compiled["layout"]
+            else {}
+        )
+        
+        # Fuzzify inputs into one membership row per case
+        memberships = np.zeros((n_cases, compiled["n_slots"]), dtype=np.float64)
+        for var_name, column in columns.items():
+            var = self.variables[var_name]
+            offset = offsets[var_name]
+            column = np.broadcast_to(column, (n_cases,))
+            block = memberships[:, offset:offset + len(var.terms)]
+            
+            if var_name not in grids:
+                block[:] = var.fuzzify_many(column)
+                continue
+            
+            # Look up values on the grid in one gather, and evaluate the
+            # membership functions for the rest
+            grid_values, table = grids[var_name]
+            idx = np.minimum(np.searchsorted(grid_values, column), len(grid_values) - 1)
+            on_grid = grid_values[idx] == column
+            block[on_grid] = table[idx[on_grid]]
+            if not on_grid.all():
+                block[~on_grid] = var.fuzzify_many(column[~on_grid])
+        
+        # Evaluate rules for every case at once
+        activations = np.zeros((n_cases, compiled["n_slots"]), dtype=np.float64)
+        if len(compiled["cons_slots"]):
+            rule_activations = np.minimum.reduceat(
+                memberships[:, compiled["flat_ant"]], compiled["rule_offsets"], axis=1
+            )
+            activations[:, compiled["cons_slots"]] = np.maximum.reduceat(
+                rule_activations, compiled["cons_offsets"], axis=1
+            )
+        
+        # Defuzzify outputs; cases where no rule activated the output get 0
+        defuzzified = {}
+        for var_name, var in self.variables.items():
+            if var_name in inputs:
+                continue
+            
+            offset = offsets[var_name]
+            term_activations = activations[:, offset:offset + len(var.terms)]
+            defuzzified[var_name] = np.where(
+                term_activations.any(axis=1), self._defuzzify_many(var, term_activations), 0.0
+            )
+        
+        return defuzzified
     
     def _defuzzify_centroid(self, var: FuzzyVariable, 
-                           term_activations: Dict[str, float]) -> float:
+                           term_activations: np.ndarray) -> float:
         """Defuzzify using the centroid method.
         
         Args:
             var: Fuzzy variable
-            term_activations: Dictionary mapping term names to activation levels
+            term_activations: Activation level of each term, in term order
         
         Returns:
             Defuzzified value
         """
         universe = var.universe
         
-        # Aggregate membership functions
-        aggregated = np.zeros_like(universe, dtype=float)
+        # A single term firing at full strength leaves its own curve as the
+        # aggregate, so the cached centroid is the answer. The activations are
+        # only a handful of values, so this check is cheaper in plain Python.
+        activations = term_activations.tolist()
+        strongest = max(activations)
+        if strongest >= 1.0 and activations.count(0.0) == len(activations) - 1:
+            return var.centroid_vector[activations.index(strongest)]
         
-        for term_name, activation in term_activations.items():
-            if activation > 0:
-                # Apply activation level to term membership function
-                term_mf = var.terms[term_name]
-                term_result = np.minimum(activation, term_mf(universe))
-                
-                # Aggregate using maximum
-                aggregated = np.maximum(aggregated, term_result)
+        # Clip each cached term curve at its activation level and aggregate
+        # using maximum
+        aggregated = np.max(
+            np.minimum(
+                term_activations.astype(universe.dtype)[:, None], var.curve_matrix
+            ),
+            axis=0,
+        )
         
         # Calculate centroid
-        if np.sum(aggregated) > 0:
-            return float(np.sum(universe * aggregated) / np.sum(aggregated))
+        total = aggregated.sum()
+        if total > 0:
+            return float(universe @ aggregated / total)
         else:
             # Default to middle of universe if no rules activated
             return float(np.mean(universe))
+    
+    def _defuzzify_weighted_average(self, var: FuzzyVariable,
+                                    term_activations: np.ndarray) -> float:
+        """Defuzzify as the activation-weighted average of term centroids.
+        
+        Each term is treated as a singleton at the centroid of its curve, so
+        no integration over the universe is needed.
+        
+        Args:
+            var: Fuzzy variable
+            term_activations: Activation level of each term, in term order
+        
+        Returns:
+            Defuzzified value
+        """
+        activations = term_activations.tolist()
+        total = sum(activations)
+        if total > 0:
+            return sum(w * c for w, c in zip(activations, var.centroid_vector)) / total
+        else:
+            return float(np.mean(var.universe))
+    
+    def _defuzzify_centroid_batch(self, var: FuzzyVariable,
+                                  term_activations: np.ndarray) -> np.ndarray:
+        """Defuzzify many cases at once using the centroid method.
+        
+        Args:
+            var: Fuzzy variable
+            term_activations: Array of shape [cases, n_terms] with the
+                activation level of each term
+        
+        Returns:
+            Array of defuzzified values, one per case
+        """
+        universe = var.universe
+        
+        # Clip and aggregate the cached curves into one row per case, then
+        # integrate all rows with a single matrix-vector product
+        aggregated = np.max(
+            np.minimum(
+                term_activations.astype(universe.dtype)[:, :, None], var.curve_matrix
+            ),
+            axis=1,
+        )
+        totals = aggregated.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centroids = (aggregated @ universe) / totals
+        values = np.where(totals > 0, centroids, np.mean(universe)).astype(np.float64)
+        
+        # Cases with a single term firing at full strength take its cached
+        # centroid, as _defuzzify_centroid does
+        n_terms = term_activations.shape[1]
+        single = (term_activations.max(axis=1) >= 1.0) & (
+            (term_activations == 0.0).sum(axis=1) == n_terms - 1
+        )
+        values[single] = np.array(var.centroid_vector)[term_activations[single].argmax(axis=1)]
+        return values
+    
+    def _defuzzify_weighted_average_batch(self, var: FuzzyVariable,
+                                          term_activations: np.ndarray) -> np.ndarray:
+        """Defuzzify many cases at once as weighted averages of term centroids.
+        
+        Args:
+            var: Fuzzy variable
+            term_activations: Array of shape [cases, n_terms] with the
+                activation level of each term
+        
+        Returns:
+            Array of defuzzified values, one per case
+        """
+        totals = term_activations.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            averages = (term_activations @ np.array(var.centroid_vector)) / totals
+        return np.where(totals > 0, averages, float(np.mean(var.universe)))
+
+
+# Membership function kernels, compiled with Numba when it is available
+
+def _jit(signature: str):
+    """Compile a kernel with Numba if installed, otherwise leave it as Python.
+    
+    fastmath is left off for all the kernels in this module, including the
+    array kernels compiled directly with njit below: NEWS-2 band boundaries
+    are exact comparisons, which fastmath's assumptions may reorder, and
+    floating point contraction would make a kernel's result depend on
+    whether it was called directly or inlined into another kernel.
+    """
+    def decorate(func):
+        if njit is None:
+            return func
+        return njit(signature, cache=True)(func)
+    return decorate
+
+
+@_jit("f8(f8, f8, f8, f8)")
+def _trimf_scalar(x, a, b, c):
+    """Triangular membership degree of a single value."""
+    if x <= a or x >= c:
+        return 0.0
+    elif x <= b:
+        return (x - a) / (b - a) if b > a else 1.0
+    else:  # b < x < c
+        return (c - x) / (c - b) if c > b else 1.0
+
+
+@_jit("f8(f8, f8, f8, f8, f8)")
+def _trapmf_scalar(x, a, b, c, d):
+    """Trapezoidal membership degree of a single value."""
+    if x <= a or x >= d:
+        return 0.0
+    elif x <= b:
+        return (x - a) / (b - a) if b > a else 1.0
+    elif x <= c:
+        return 1.0
+    else:  # c < x < d
+        return (d - x) / (d - c) if d > c else 1.0
+
+
+@_jit("f8(f8, f8, f8)")
+def _gaussmf_scalar(x, mean, inv_two_sigma_sq):
+    """Gaussian membership degree of a single value.
+
+    Takes ``1 / (2 * sigma ** 2)`` rather than sigma so callers can hoist it.
+    """
+    d = x - mean
+    return math.exp(-d * d * inv_two_sigma_sq)
+
+
+# Kernel kinds used by FuzzyVariable.mf_blocks
+_MF_KINDS = {_trimf_scalar: 0, _trapmf_scalar: 1, _gaussmf_scalar: 2}
+
+
+@_jit("f8[:](f8, i1[:], f8[:, :])")
+def _fuzzify_block(x, kinds, params):
+    """Membership degrees of a single value for a block of terms."""
+    out = np.zeros(len(kinds))
+    for i in range(len(kinds)):
+        kind = kinds[i]
+        if kind == 0:
+            out[i] = _trimf_scalar(x, params[i, 0], params[i, 1], params[i, 2])
+        elif kind == 1:
+            out[i] = _trapmf_scalar(
+                x, params[i, 0], params[i, 1], params[i, 2], params[i, 3]
+            )
+        elif kind == 2:
+            out[i] = _gaussmf_scalar(x, params[i, 0], params[i, 1])
+    return out
+
+
+if njit is not None:
+    @njit("f8[:](f8[:], f8, f8, f8)", cache=True)
+    def _trimf_array(x, a, b, c):
+        """Triangular membership degrees of a 1-D array."""
+        y = np.zeros(x.size)
+        for i in range(x.size):
+            xi = x[i]
+            if xi == b:
+                y[i] = 1.0
+            elif a < xi < b:
+                y[i] = (xi - a) / (b - a)
+            elif b < xi < c:
+                y[i] = (c - xi) / (c - b)
+        return y
+
+    @njit("f8[:](f8[:], f8, f8, f8, f8)", cache=True)
+    def _trapmf_array(x, a, b, c, d):
+        """Trapezoidal membership degrees of a 1-D array."""
+        y = np.zeros(x.size)
+        for i in range(x.size):
+            xi = x[i]
+            if xi == b or xi == c or b < xi < c:
+                y[i] = 1.0
+            elif a < xi < b:
+                y[i] = (xi - a) / (b - a)
+            elif c < xi < d:
+                y[i] = (d - xi) / (d - c)
+        return y
+
+
+def _trimf_where(x, a, b, c):
+    """Triangular membership degrees of an array, branch for branch like _trimf_scalar."""
+    left = (x - a) / (b - a) if b > a else 1.0
+    right = (c - x) / (c - b) if c > b else 1.0
+    return np.where((x <= a) | (x >= c), 0.0, np.where(x <= b, left, right))
+
+
+def _trapmf_where(x, a, b, c, d):
+    """Trapezoidal membership degrees of an array, branch for branch like _trapmf_scalar."""
+    left = (x - a) / (b - a) if b > a else 1.0
+    right = (d - x) / (d - c) if d > c else 1.0
+    return np.where(
+        (x <= a) | (x >= d), 0.0,
+        np.where(x <= b, left, np.where(x <= c, 1.0, right))
+    )
+
+
+def _inverse_slope(start: float, end: float) -> float:
+    """Return 1 / (end - start), or +inf for a vertical edge."""
+    return 1.0 / (end - start) if end > start else np.inf
+
+
+def _trimf_fused(x, a, b, c, inv_left, inv_right):
+    """Triangular membership degrees of an array as one fused expression.
+    
+    Vertical edges use an infinite inverse slope. The 0 * inf NaN at the
+    foot of such an edge is discarded by np.fmin, and is only left when
+    both edges are vertical, i.e. at the peak of a singleton.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        y = np.fmin((x - a) * inv_left, (c - x) * inv_right)
+    return np.fmax(0.0, np.nan_to_num(y, nan=1.0))
+
+
+def _trapmf_fused(x, a, b, c, d, inv_left, inv_right):
+    """Trapezoidal membership degrees of an array as one fused expression.
+    
+    Vertical edges are handled as in _trimf_fused.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        y = np.fmin((x - a) * inv_left, (d - x) * inv_right)
+    return np.clip(np.nan_to_num(y, nan=1.0), 0.0, 1.0)
+
+
+def _gaussmf_fused(x, mean, inv_two_sigma_sq):
+    """Gaussian membership degrees of an array, computed in one buffer.
+    
+    np.exp already dispatches to NumPy's SIMD kernels, so the remaining cost
+    is the temporaries of the textbook expression; each step here writes
+    into the same float64 buffer instead.
+    """
+    y = np.subtract(x, mean, dtype=np.float64)
+    np.multiply(y, y, out=y)
+    np.multiply(y, -inv_two_sigma_sq, out=y)
+    return np.exp(y, out=y)
 
 
 # Helper functions for creating membership functions
@@ -289,30 +969,16 @@ def trimf(x: Union[float, np.ndarray], abc: Tuple[float, float, float]) -> Union
     
     if isinstance(x, (int, float)):
         # Handle scalar input
-        if x <= a or x >= c:
-            return 0.0
-        elif a < x <= b:
-            return (x - a) / (b - a) if b > a else 1.0
-        else:  # b < x < c
-            return (c - x) / (c - b) if c > b else 1.0
+        return _trimf_scalar(x, a, b, c)
+    elif njit is not None:
+        # Handle array input with the compiled kernel
+        x = np.asarray(x, dtype=np.float64)
+        return _trimf_array(x.ravel(), float(a), float(b), float(c)).reshape(x.shape)
     else:
         # Handle array input
-        y = np.zeros_like(x, dtype=float)
-        
-        # Left side
-        idx = np.logical_and(a < x, x <= b)
-        if b > a:
-            y[idx] = (x[idx] - a) / (b - a)
-        
-        # Right side
-        idx = np.logical_and(b < x, x < c)
-        if c > b:
-            y[idx] = (c - x[idx]) / (c - b)
-        
-        # Peak
-        y[x == b] = 1.0
-        
-        return y
+        return _trimf_fused(
+            x, a, b, c, _inverse_slope(a, b), _inverse_slope(b, c)
+        )
 
 
 def trapmf(x: Union[float, np.ndarray], abcd: Tuple[float, float, float, float]) -> Union[float, np.ndarray]:
@@ -333,37 +999,18 @@ def trapmf(x: Union[float, np.ndarray], abcd: Tuple[float, float, float, float])
     
     if isinstance(x, (int, float)):
         # Handle scalar input
-        if x <= a or x >= d:
-            return 0.0
-        elif a < x <= b:
-            return (x - a) / (b - a) if b > a else 1.0
-        elif b < x <= c:
-            return 1.0
-        else:  # c < x < d
-            return (d - x) / (d - c) if d > c else 1.0
+        return _trapmf_scalar(x, a, b, c, d)
+    elif njit is not None:
+        # Handle array input with the compiled kernel
+        x = np.asarray(x, dtype=np.float64)
+        return _trapmf_array(
+            x.ravel(), float(a), float(b), float(c), float(d)
+        ).reshape(x.shape)
     else:
         # Handle array input
-        y = np.zeros_like(x, dtype=float)
-        
-        # Left slope
-        idx = np.logical_and(a < x, x <= b)
-        if b > a:
-            y[idx] = (x[idx] - a) / (b - a)
-        
-        # Flat top
-        idx = np.logical_and(b < x, x <= c)
-        y[idx] = 1.0
-        
-        # Right slope
-        idx = np.logical_and(c < x, x < d)
-        if d > c:
-            y[idx] = (d - x[idx]) / (d - c)
-        
-        # Shoulders
-        y[x == b] = 1.0
-        y[x == c] = 1.0
-        
-        return y
+        return _trapmf_fused(
+            x, a, b, c, d, _inverse_slope(a, b), _inverse_slope(c, d)
+        )
 
 
 def gaussmf(x: Union[float, np.ndarray], mean: float, sigma: float) -> Union[float, np.ndarray]:
@@ -380,10 +1027,11 @@ def gaussmf(x: Union[float, np.ndarray], mean: float, sigma: float) -> Union[flo
     if sigma <= 0:
         raise ValueError("Sigma must be positive")
     
+    inv_two_sigma_sq = 1.0 / (2.0 * sigma * sigma)
     if isinstance(x, (int, float)):
-        return np.exp(-((x - mean) ** 2) / (2 * sigma ** 2))
+        return _gaussmf_scalar(x, mean, inv_two_sigma_sq)
     else:
-        return np.exp(-((x - mean) ** 2) / (2 * sigma ** 2))
+        return _gaussmf_fused(x, mean, inv_two_sigma_sq)
 
 
 # Factory functions for creating membership functions
@@ -397,7 +1045,23 @@ def create_trimf(abc: Tuple[float, float, float]) -> Callable[[Union[float, np.n
     Returns:
         Membership function
     """
-    return lambda x: trimf(x, abc)
+    a, b, c = abc
+    inv_left, inv_right = _inverse_slope(a, b), _inverse_slope(b, c)
+    # Parameters bound once for the compiled array kernel
+    fa, fb, fc = float(a), float(b), float(c)
+    
+    def mf(x):
+        if isinstance(x, (int, float)):
+            return _trimf_scalar(x, a, b, c)
+        if njit is None:
+            return _trimf_fused(x, a, b, c, inv_left, inv_right)
+        x = np.asarray(x, dtype=np.float64)
+        return _trimf_array(x.ravel(), fa, fb, fc).reshape(x.shape)
+    
+    # Scalar kernel and parameters, inlined by compile_specialized
+    mf.kernel = _trimf_scalar
+    mf.params = (a, b, c)
+    return mf
 
 
 def create_trapmf(abcd: Tuple[float, float, float, float]) -> Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]]:
@@ -409,7 +1073,23 @@ def create_trapmf(abcd: Tuple[float, float, float, float]) -> Callable[[Union[fl
     Returns:
         Membership function
     """
-    return lambda x: trapmf(x, abcd)
+    a, b, c, d = abcd
+    inv_left, inv_right = _inverse_slope(a, b), _inverse_slope(c, d)
+    # Parameters bound once for the compiled array kernel
+    fa, fb, fc, fd = float(a), float(b), float(c), float(d)
+    
+    def mf(x):
+        if isinstance(x, (int, float)):
+            return _trapmf_scalar(x, a, b, c, d)
+        if njit is None:
+            return _trapmf_fused(x, a, b, c, d, inv_left, inv_right)
+        x = np.asarray(x, dtype=np.float64)
+        return _trapmf_array(x.ravel(), fa, fb, fc, fd).reshape(x.shape)
+    
+    # Scalar kernel and parameters, inlined by compile_specialized
+    mf.kernel = _trapmf_scalar
+    mf.params = (a, b, c, d)
+    return mf
 
 
 def create_gaussmf(mean: float, sigma: float) -> Callable[[Union[float, np.ndarray]], Union[float, np.ndarray]]:
@@ -421,5 +1101,23 @@ def create_gaussmf(mean: float, sigma: float) -> Callable[[Union[float, np.ndarr
     
     Returns:
         Membership function
+    
+    Raises:
+        ValueError: If sigma is not positive
     """
-    return lambda x: gaussmf(x, mean, sigma)
+    if sigma <= 0:
+        raise ValueError("Sigma must be positive")
+    
+    # Bind the mean and 1 / (2 * sigma ** 2) once instead of on every call
+    m = float(mean)
+    inv_two_sigma_sq = 1.0 / (2.0 * sigma * sigma)
+    
+    def mf(x):
+        if isinstance(x, (int, float)):
+            return _gaussmf_scalar(x, m, inv_two_sigma_sq)
+        return _gaussmf_fused(x, m, inv_two_sigma_sq)
+    
+    # Scalar kernel and parameters, inlined by compile_specialized
+    mf.kernel = _gaussmf_scalar
+    mf.params = (m, inv_two_sigma_sq)
+    return mf
@@ -19,9 +19,15 @@ from .custom_fuzzy import (
 class FuzzyLogic:
     """Base class for fuzzy logic operations."""
     
-    def __init__(self):
-        """Initialize the fuzzy logic system."""
-        self.system = CustomFuzzyLogic()
+    def __init__(self, defuzzification="centroid"):
+        """
+        Initialize the fuzzy logic system.
+        
+        Args:
+            defuzzification (str, optional): "centroid" (Mamdani) or
+                "weighted_average" (Sugeno-style term centroids)
+        """
+        self.system = CustomFuzzyLogic(defuzzification)
         self.antecedents = {}
         self.consequents = {}
         self.rules = []
@@ -86,6 +92,21 @@ class FuzzyLogic:
         self.consequents[name] = variable
         return variable
     
+    def add_rule_direct(self, antecedent_dict, consequent_tuple):
+        """
+        Add a rule that is already in the system's native form.
+        
+        Args:
+            antecedent_dict (dict): Dictionary mapping antecedent names to term names
+            consequent_tuple (tuple): Tuple of (consequent name, term name)
+        
+        Returns:
+            Rule: The created rule
+        """
+        rule = self.system.add_rule(antecedent_dict, consequent_tuple)
+        self.rules.append(rule)
+        return rule
+    
     def _add_rule(self, antecedent_combination, consequent_result):
         """
         Add a rule to the fuzzy control system.
@@ -97,6 +118,10 @@ class FuzzyLogic:
         Returns:
             Rule: The created rule
         """
+        # Rules already in native form skip the expression parsing
+        if isinstance(antecedent_combination, dict) and isinstance(consequent_result, tuple):
+            return self.add_rule_direct(antecedent_combination, consequent_result)
+        
         # Extract the antecedent and consequent parts
         antecedent_dict = {}
         consequent_tuple = None
@@ -137,43 +162,40 @@ class FuzzyLogic:
         if not antecedent_dict or not consequent_tuple:
             raise ValueError("Could not parse rule expressions")
         
-        # Add the rule
-        rule = self.system.add_rule(antecedent_dict, consequent_tuple)
-        self.rules.append(rule)
-        return rule
+        return self.add_rule_direct(antecedent_dict, consequent_tuple)
     
     def _extract_terms_from_and_terms(self, and_terms, antecedent_dict):
         """
         Extract terms from an AndTerms object.
         
+        The expression tree is walked once with an explicit stack, left to
+        right, recording each term by its variable and term name.
+        
         Args:
             and_terms: AndTerms to extract from
             antecedent_dict: Dictionary to store extracted terms
         """
-        if isinstance(and_terms.left, FuzzyTerm):
-            var = and_terms.left.variable
-            term = and_terms.left.term_name
-            antecedent_dict[var.name] = term
-        elif isinstance(and_terms.left, AndTerms):
-            self._extract_terms_from_and_terms(and_terms.left, antecedent_dict)
-        
-        if isinstance(and_terms.right, FuzzyTerm):
-            var = and_terms.right.variable
-            term = and_terms.right.term_name
-            antecedent_dict[var.name] = term
-        elif isinstance(and_terms.right, AndTerms):
-            self._extract_terms_from_and_terms(and_terms.right, antecedent_dict)
+        stack = [and_terms]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, AndTerms):
+                stack.append(node.right)
+                stack.append(node.left)
+            elif isinstance(node, FuzzyTerm):
+                antecedent_dict[node.variable.name] = node.term_name
     
-    def build_control_system(self, rules):
+    def build_control_system(self, rules, input_grids=None):
         """
         Build the fuzzy control system from rules.
         
         Args:
             rules (list): List of fuzzy rules
+            input_grids (dict, optional): Dictionary mapping antecedent names to
+                the exact input values to precompute memberships for
         """
-        # The rules are already added during _add_rule
-        # So we don't need to do anything here
-        pass
+        # The rules are already added during _add_rule, so only generate
+        # the specialized inference code for the antecedents
+        self.system.compile_specialized(list(self.antecedents), input_grids)
     
     def compute(self, inputs):
         """
@@ -194,6 +216,8 @@ class FuzzyLogic:
 # Create classes to mimic skfuzzy's API for backward compatibility
 
 class Term:
+    __slots__ = ("parent", "term")
+    
     def __init__(self, parent, term):
         self.parent = parent
         self.term = term
@@ -203,12 +227,16 @@ class Term:
 
 
 class AndTerm:
+    __slots__ = ("left", "right")
+    
     def __init__(self, left, right):
         self.left = left
         self.right = right
 
 
 class MockAntecedent:
+    __slots__ = ("universe", "label", "terms")
+    
     def __init__(self, universe, label):
         self.universe = universe
         self.label = label
@@ -220,7 +248,7 @@ class MockAntecedent:
 
 
 class MockConsequent(MockAntecedent):
-    pass
+    __slots__ = ()
 
 
 # Mock control module to provide backward compatibility
@@ -249,22 +277,24 @@ class control:
                     self.consequents.append(rule.consequent.parent)
     
     class ControlSystemSimulation:
+        __slots__ = ("control_system", "_input", "_output")
+        
         def __init__(self, control_system):
             self.control_system = control_system
-            self.input = {}
-            self.output = {}
+            self._input = {}
+            self._output = {}
         
-        def input(self, input_dict):
+        def set_input(self, input_dict):
             """Set input values."""
-            self.input = input_dict
+            self._input = input_dict
         
         def compute(self):
             """Compute the fuzzy inference."""
             # This is a mock implementation
             # In a real implementation, this would compute the fuzzy inference
             for consequent in self.control_system.consequents:
-                self.output[consequent.label] = 5.0  # Dummy value
+                self._output[consequent.label] = 5.0  # Dummy value
         
-        def output(self):
+        def get_output(self):
             """Get output values."""
-            return self.output
+            return self._output
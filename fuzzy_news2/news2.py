@@ -2,21 +2,194 @@
 Implementation of the NEWS-2 score using fuzzy logic.
 """
 
+import struct
+import weakref
 import numpy as np
+from bisect import bisect_left
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional, Union
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Literal, Optional, Sequence
 
 from .fuzzy_logic import FuzzyLogic
+from .utils import _dumps
 
-@dataclass
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the pure Python scorer
+    njit = None
+
+# Crisp NEWS-2 scoring bands. Each *_BINS tuple holds the inclusive upper
+# bound of every band but the last, and *_SCORES the score of each band, so
+# the score of a value is *_SCORES[bisect_left(*_BINS, value)].
+_RR_BINS = (8, 11, 20, 24)
+_RR_SCORES = (3, 1, 0, 2, 3)
+_O2_BINS = (91, 93, 95)
+_O2_SCORES = (3, 2, 1, 0)
+_BP_BINS = (90, 100, 110, 219)
+_BP_SCORES = (3, 2, 1, 0, 3)
+_PULSE_BINS = (40, 50, 90, 110, 130)
+_PULSE_SCORES = (3, 1, 0, 1, 2, 3)
+_TEMP_BINS = (35.0, 36.0, 38.0, 39.0)
+_TEMP_SCORES = (3, 1, 0, 1, 2)
+_O2_THERAPY_SCORE = 2
+
+# Consciousness scores indexed by ord(level) - ord("A"), -1 marks an invalid level
+_CONSCIOUSNESS_SCORES = np.full(26, -1, dtype=np.int8)
+for _level, _score in {"A": 0, "V": 3, "P": 3, "U": 3}.items():
+    _CONSCIOUSNESS_SCORES[ord(_level) - ord("A")] = _score
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _band_score(bins, scores, value):
+        """Score of the band that value falls in."""
+        for i in range(len(bins)):
+            if value <= bins[i]:
+                return scores[i]
+        # NaN compares false against every bound and lands here too
+        return scores[-1]
+else:
+    def _band_score(bins, scores, value):
+        """Score of the band that value falls in."""
+        # NaN compares false against every bound and, as with np.searchsorted,
+        # falls through to the last band
+        return scores[bisect_left(bins, value) if value == value else -1]
+
+
+def _crisp_core(rr, o2, bp, pulse, temp, cons_score, supp_o2):
+    """
+    Score the numeric NEWS-2 parameters.
+    
+    Compiled with Numba when it is available. fastmath is left off so that
+    NaN comparisons keep their IEEE semantics.
+    
+    Returns:
+        Tuple of (respiratory rate, oxygen saturation, supplemental oxygen,
+        systolic BP, pulse, consciousness, temperature, total) scores
+    """
+    resp_score = _band_score(_RR_BINS, _RR_SCORES, rr)
+    o2_score = _band_score(_O2_BINS, _O2_SCORES, o2)
+    o2_therapy_score = _O2_THERAPY_SCORE if supp_o2 else 0
+    bp_score = _band_score(_BP_BINS, _BP_SCORES, bp)
+    pulse_score = _band_score(_PULSE_BINS, _PULSE_SCORES, pulse)
+    temp_score = _band_score(_TEMP_BINS, _TEMP_SCORES, temp)
+    total_score = (
+        resp_score + o2_score + o2_therapy_score + bp_score +
+        pulse_score + cons_score + temp_score
+    )
+    return (resp_score, o2_score, o2_therapy_score, bp_score,
+            pulse_score, cons_score, temp_score, total_score)
+
+
+if njit is not None:
+    _crisp_core = njit("UniTuple(i8, 8)(f8, f8, f8, f8, f8, i8, b1)", cache=True)(_crisp_core)
+
+
+def _band_scores(bins, scores, values) -> np.ndarray:
+    """Scores of the bands that an array of values falls in."""
+    return np.take(scores, np.searchsorted(bins, values))
+
+@dataclass(frozen=True, eq=False)
+class NEWS2Scores(Mapping):
+    """
+    Crisp NEWS-2 parameter scores packed into an int8 array.
+    
+    Behaves as a read-only mapping from parameter name to score, so it can
+    be used wherever the dictionary of scores used to be; to_dict() gives
+    a plain dictionary for serialization.
+    """
+    _arr: np.ndarray
+    
+    KEYS = (
+        "respiratory_rate", "oxygen_saturation", "supplemental_oxygen",
+        "systolic_bp", "pulse", "consciousness", "temperature", "total",
+    )
+    _INDEX = {key: i for i, key in enumerate(KEYS)}
+    
+    def __post_init__(self):
+        arr = np.array(self._arr, dtype=np.int8)
+        arr.flags.writeable = False
+        object.__setattr__(self, "_arr", arr)
+    
+    def __getitem__(self, key: str) -> int:
+        return int(self._arr[self._INDEX[key]])
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+    
+    def __len__(self) -> int:
+        return len(self.KEYS)
+    
+    def __repr__(self) -> str:
+        return f"NEWS2Scores({self.to_dict()})"
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Return the scores as a dictionary of Python ints."""
+        return dict(zip(self.KEYS, self._arr.tolist()))
+
+
+@dataclass(frozen=True, slots=True)
 class NEWS2Result:
     """Result of NEWS-2 calculation."""
     crisp_score: int
     fuzzy_score: float
     risk_category: str
     recommended_response: str
-    parameter_scores: Dict[str, Union[int, float]]
-    fuzzy_memberships: Dict[str, Dict[str, float]]
+    parameter_scores: NEWS2Scores
+    fuzzy_memberships: Mapping[str, Mapping[str, float]]
+    
+    # Seven int8 parameter scores followed by the float32 fuzzy score
+    PACKED_FORMAT = struct.Struct("<7bf")
+    
+    def __post_init__(self):
+        # Results are cached and shared between callers, so the memberships
+        # are frozen into read-only views of private copies
+        object.__setattr__(self, "fuzzy_memberships", MappingProxyType({
+            name: MappingProxyType(dict(terms))
+            for name, terms in self.fuzzy_memberships.items()
+        }))
+    
+    def __reduce__(self):
+        # Mapping proxies can't be pickled, so results (e.g. returned from
+        # API worker processes) are rebuilt from plain dictionaries
+        return (type(self), (
+            self.crisp_score, self.fuzzy_score, self.risk_category,
+            self.recommended_response, self.parameter_scores,
+            self._plain_memberships(),
+        ))
+    
+    def _plain_memberships(self) -> Dict[str, Dict[str, float]]:
+        """Return a mutable copy of the memberships as nested dictionaries."""
+        return {name: dict(terms) for name, terms in self.fuzzy_memberships.items()}
+    
+    @property
+    def packed(self) -> bytes:
+        """
+        The parameter scores and fuzzy score packed into PACKED_FORMAT.
+        
+        The total is left out since it is the sum of the parameter scores,
+        and the fuzzy score is rounded to single precision.
+        """
+        return self.PACKED_FORMAT.pack(
+            *self.parameter_scores._arr[:-1].tolist(), self.fuzzy_score
+        )
+    
+    def to_dict(self) -> Dict[str, object]:
+        """Return the result as a dictionary of JSON-compatible values."""
+        return {
+            "crisp_score": self.crisp_score,
+            "fuzzy_score": self.fuzzy_score,
+            "risk_category": self.risk_category,
+            "recommended_response": self.recommended_response,
+            "parameter_scores": self.parameter_scores.to_dict(),
+            "fuzzy_memberships": self._plain_memberships(),
+        }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize the result to JSON bytes."""
+        return _dumps(self.to_dict())
 
 
 class FuzzyNEWS2:
@@ -38,142 +211,65 @@ class FuzzyNEWS2:
         "U": 3,  # Unresponsive
     }
     
-    def __init__(self):
-        """Initialize the FuzzyNEWS2 system."""
-        self.fuzzy_system = FuzzyLogic()
-        self._setup_fuzzy_system()
-    
-    def _setup_fuzzy_system(self):
-        """Set up the fuzzy logic system for NEWS-2 calculation."""
-        # Define universes for input variables
-        respiratory_rate_universe = np.arange(0, 50, 1)
-        oxygen_saturation_universe = np.arange(70, 101, 1)
-        systolic_bp_universe = np.arange(50, 250, 1)
-        pulse_universe = np.arange(20, 180, 1)
-        temperature_universe = np.arange(33, 43, 0.1)
-        
-        # Define universe for output variable (NEWS-2 score)
-        score_universe = np.arange(0, 21, 0.1)
-        
-        # Define membership functions for respiratory rate
-        resp_rate_mfs = {
-            "normal": {"type": "trimf", "params": [8, 12, 20]},
-            "low": {"type": "trapmf", "params": [0, 0, 8, 12]},
-            "high": {"type": "trapmf", "params": [20, 24, 50, 50]},
-            "very_high": {"type": "trapmf", "params": [24, 30, 50, 50]}
-        }
-        
-        # Define membership functions for oxygen saturation
-        oxygen_sat_mfs = {
-            "normal": {"type": "trapmf", "params": [96, 98, 100, 100]},
-            "low": {"type": "trimf", "params": [94, 95, 96]},
-            "very_low": {"type": "trapmf", "params": [70, 70, 92, 94]}
-        }
-        
-        # Define membership functions for systolic blood pressure
-        systolic_bp_mfs = {
-            "normal": {"type": "trimf", "params": [111, 130, 219]},
-            "low": {"type": "trimf", "params": [101, 105, 111]},
-            "very_low": {"type": "trapmf", "params": [50, 50, 90, 101]},
-            "high": {"type": "trapmf", "params": [219, 230, 250, 250]}
-        }
-        
-        # Define membership functions for pulse rate
-        pulse_mfs = {
-            "normal": {"type": "trimf", "params": [51, 70, 90]},
-            "low": {"type": "trapmf", "params": [20, 20, 40, 51]},
-            "high": {"type": "trimf", "params": [90, 110, 130]},
-            "very_high": {"type": "trapmf", "params": [130, 140, 180, 180]}
-        }
-        
-        # Define membership functions for temperature
-        temperature_mfs = {
-            "normal": {"type": "trimf", "params": [36.1, 37.0, 38.0]},
-            "low": {"type": "trimf", "params": [35.1, 35.5, 36.1]},
-            "very_low": {"type": "trapmf", "params": [33.0, 33.0, 35.0, 35.1]},
-            "high": {"type": "trimf", "params": [38.0, 38.5, 39.0]},
-            "very_high": {"type": "trapmf", "params": [39.0, 39.5, 43.0, 43.0]}
-        }
-        
-        # Define membership functions for NEWS-2 score
-        score_mfs = {
-            "low": {"type": "trimf", "params": [0, 1, 4]},
-            "medium": {"type": "trimf", "params": [4, 6, 7]},
-            "high": {"type": "trapmf", "params": [7, 9, 20, 20]}
-        }
-        
-        # Create antecedents
-        resp_rate = self.fuzzy_system._create_antecedent(
-            "respiratory_rate", respiratory_rate_universe, resp_rate_mfs
-        )
-        
-        oxygen_sat = self.fuzzy_system._create_antecedent(
-            "oxygen_saturation", oxygen_saturation_universe, oxygen_sat_mfs
-        )
-        
-        systolic_bp = self.fuzzy_system._create_antecedent(
-            "systolic_bp", systolic_bp_universe, systolic_bp_mfs
-        )
+    def __init__(self, defuzzification: str = "centroid", cache_size: int = 100_000,
+                 fuzzy_fallback: bool = False):
+        """Initialize the FuzzyNEWS2 system.
         
-        pulse = self.fuzzy_system._create_antecedent(
-            "pulse", pulse_universe, pulse_mfs
-        )
+        Args:
+            defuzzification: "centroid" for Mamdani inference, or
+                "weighted_average" to defuzzify the NEWS-2 score as the
+                Sugeno-style weighted average of its output term centroids
+            cache_size: Number of results calculate() keeps for repeated
+                vital signs; 0 disables the cache
+            fuzzy_fallback: Report the crisp total as the fuzzy score when
+                the fuzzy inference raises, instead of propagating the error
+        """
+        self.fuzzy_system = _shared_fuzzy_system(defuzzification)
+        self._use_fuzzy_fallback = fuzzy_fallback
+        
+        # The calculation is a pure function of the vitals and the results
+        # are immutable, so cached results can be shared between callers.
+        # The cache reaches the instance through a weak reference: holding
+        # a bound method would form a cycle that only the cyclic garbage
+        # collector could free
+        self._calculate_cached = None
+        if cache_size:
+            instance = weakref.ref(self)
+            
+            @lru_cache(maxsize=cache_size)
+            def calculate_cached(*vitals) -> NEWS2Result:
+                return instance()._calculate(*vitals)
+            
+            self._calculate_cached = calculate_cached
+    
+    def _fuzzy_score(
+        self,
+        fuzzy_inputs: Dict[str, float],
+        crisp_scores: NEWS2Scores,
+        supplemental_oxygen: bool
+    ) -> float:
+        """
+        Calculate the fuzzy NEWS-2 score.
         
-        temperature = self.fuzzy_system._create_antecedent(
-            "temperature", temperature_universe, temperature_mfs
-        )
+        Args:
+            fuzzy_inputs: Numeric vital signs keyed by fuzzy input name
+            crisp_scores: Crisp scores of the same vital signs
+            supplemental_oxygen: Whether supplemental oxygen is being used
         
-        # Create consequent
-        score = self.fuzzy_system._create_consequent(
-            "score", score_universe, score_mfs
-        )
+        Returns:
+            Fuzzy score of the numeric parameters plus the crisp supplemental
+            oxygen and consciousness scores
+        """
+        # Compute fuzzy result
+        fuzzy_score = self.fuzzy_system.compute(fuzzy_inputs)["score"]
         
-        # Define rules
-        rules = [
-            # Respiratory rate rules
-            self.fuzzy_system._add_rule(resp_rate["normal"], score["low"]),
-            self.fuzzy_system._add_rule(resp_rate["low"], score["medium"]),
-            self.fuzzy_system._add_rule(resp_rate["high"], score["medium"]),
-            self.fuzzy_system._add_rule(resp_rate["very_high"], score["high"]),
-            
-            # Oxygen saturation rules
-            self.fuzzy_system._add_rule(oxygen_sat["normal"], score["low"]),
-            self.fuzzy_system._add_rule(oxygen_sat["low"], score["medium"]),
-            self.fuzzy_system._add_rule(oxygen_sat["very_low"], score["high"]),
-            
-            # Systolic BP rules
-            self.fuzzy_system._add_rule(systolic_bp["normal"], score["low"]),
-            self.fuzzy_system._add_rule(systolic_bp["low"], score["medium"]),
-            self.fuzzy_system._add_rule(systolic_bp["very_low"], score["high"]),
-            self.fuzzy_system._add_rule(systolic_bp["high"], score["medium"]),
-            
-            # Pulse rules
-            self.fuzzy_system._add_rule(pulse["normal"], score["low"]),
-            self.fuzzy_system._add_rule(pulse["low"], score["medium"]),
-            self.fuzzy_system._add_rule(pulse["high"], score["medium"]),
-            self.fuzzy_system._add_rule(pulse["very_high"], score["high"]),
-            
-            # Temperature rules
-            self.fuzzy_system._add_rule(temperature["normal"], score["low"]),
-            self.fuzzy_system._add_rule(temperature["low"], score["medium"]),
-            self.fuzzy_system._add_rule(temperature["very_low"], score["high"]),
-            self.fuzzy_system._add_rule(temperature["high"], score["medium"]),
-            self.fuzzy_system._add_rule(temperature["very_high"], score["high"]),
-            
-            # Combination rules
-            self.fuzzy_system._add_rule(
-                (resp_rate["high"] & oxygen_sat["low"]), score["high"]
-            ),
-            self.fuzzy_system._add_rule(
-                (pulse["high"] & resp_rate["high"]), score["high"]
-            ),
-            self.fuzzy_system._add_rule(
-                (systolic_bp["low"] & pulse["high"]), score["high"]
-            ),
-        ]
+        # Add supplemental oxygen score to fuzzy score (handled as crisp)
+        if supplemental_oxygen:
+            fuzzy_score += 2
         
-        # Build the control system
-        self.fuzzy_system.build_control_system(rules)
+        # Add consciousness score to fuzzy score (handled as crisp);
+        # the crisp scoring has already looked it up
+        return fuzzy_score + crisp_scores["consciousness"]
     
     def _calculate_crisp_score(
         self,
@@ -184,7 +280,7 @@ class FuzzyNEWS2:
         consciousness: str,
         temperature: float,
         supplemental_oxygen: bool
-    ) -> Dict[str, int]:
+    ) -> NEWS2Scores:
         """
         Calculate the traditional NEWS-2 score.
         
@@ -198,97 +294,75 @@ class FuzzyNEWS2:
             supplemental_oxygen: Whether supplemental oxygen is being used
         
         Returns:
-            Dictionary of parameter scores and total score
+            Parameter scores and total score
         """
-        # Respiratory rate score
-        if respiratory_rate <= 8:
-            resp_score = 3
-        elif respiratory_rate <= 11:
-            resp_score = 1
-        elif respiratory_rate <= 20:
-            resp_score = 0
-        elif respiratory_rate <= 24:
-            resp_score = 2
-        else:  # > 24
-            resp_score = 3
-        
-        # Oxygen saturation score
-        if oxygen_saturation <= 91:
-            o2_score = 3
-        elif oxygen_saturation <= 93:
-            o2_score = 2
-        elif oxygen_saturation <= 95:
-            o2_score = 1
-        else:  # >= 96
-            o2_score = 0
-        
-        # Supplemental oxygen score
-        if supplemental_oxygen:
-            o2_therapy_score = 2
-        else:
-            o2_therapy_score = 0
-        
-        # Systolic BP score
-        if systolic_bp <= 90:
-            bp_score = 3
-        elif systolic_bp <= 100:
-            bp_score = 2
-        elif systolic_bp <= 110:
-            bp_score = 1
-        elif systolic_bp <= 219:
-            bp_score = 0
-        else:  # >= 220
-            bp_score = 3
-        
-        # Pulse score
-        if pulse <= 40:
-            pulse_score = 3
-        elif pulse <= 50:
-            pulse_score = 1
-        elif pulse <= 90:
-            pulse_score = 0
-        elif pulse <= 110:
-            pulse_score = 1
-        elif pulse <= 130:
-            pulse_score = 2
-        else:  # > 130
-            pulse_score = 3
-        
-        # Consciousness score
-        if consciousness in self.CONSCIOUSNESS_LEVELS:
-            consciousness_score = self.CONSCIOUSNESS_LEVELS[consciousness]
-        else:
+        # Consciousness score, with a single lookup
+        consciousness_score = self.CONSCIOUSNESS_LEVELS.get(consciousness)
+        if consciousness_score is None:
             raise ValueError(f"Invalid consciousness level: {consciousness}. "
                            f"Must be one of {list(self.CONSCIOUSNESS_LEVELS.keys())}.")
         
-        # Temperature score
-        if temperature <= 35.0:
-            temp_score = 3
-        elif temperature <= 36.0:
-            temp_score = 1
-        elif temperature <= 38.0:
-            temp_score = 0
-        elif temperature <= 39.0:
-            temp_score = 1
-        else:  # > 39.0
-            temp_score = 2
-        
-        # Calculate total score
-        total_score = (
-            resp_score + o2_score + o2_therapy_score + bp_score +
-            pulse_score + consciousness_score + temp_score
-        )
+        # _crisp_core returns the scores in NEWS2Scores.KEYS order
+        return NEWS2Scores(_crisp_core(
+            respiratory_rate, oxygen_saturation, systolic_bp, pulse,
+            temperature, consciousness_score, supplemental_oxygen
+        ))
+    
+    def calculate_crisp_batch(
+        self,
+        respiratory_rate: Sequence[int],
+        oxygen_saturation: Sequence[int],
+        systolic_bp: Sequence[int],
+        pulse: Sequence[int],
+        consciousness: Sequence[str],
+        temperature: Sequence[float],
+        supplemental_oxygen: Sequence[bool]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate the traditional NEWS-2 score for many patients at once.
         
-        return {
-            "respiratory_rate": resp_score,
-            "oxygen_saturation": o2_score,
-            "supplemental_oxygen": o2_therapy_score,
-            "systolic_bp": bp_score,
-            "pulse": pulse_score,
-            "consciousness": consciousness_score,
-            "temperature": temp_score,
-            "total": total_score
+        Args:
+            respiratory_rate: Breaths per minute of each patient
+            oxygen_saturation: O2 saturation (%) of each patient
+            systolic_bp: Systolic blood pressure (mmHg) of each patient
+            pulse: Pulse rate (beats per minute) of each patient
+            consciousness: Level of consciousness (A, V, P, or U) of each patient
+            temperature: Body temperature (°C) of each patient
+            supplemental_oxygen: Whether each patient is using supplemental oxygen
+        
+        Returns:
+            Dictionary of per-patient parameter score arrays and total score array,
+            keyed like the result of _calculate_crisp_score
+        
+        Raises:
+            ValueError: If any consciousness level is invalid
+        """
+        # Map single-letter levels through the lookup table; anything else
+        # (lowercase, multi-letter, empty) is rejected below
+        levels = np.asarray(consciousness, dtype=str)
+        codes = levels.astype("U1").view(np.uint32) - ord("A")
+        known = (np.char.str_len(levels) == 1) & (codes < len(_CONSCIOUSNESS_SCORES))
+        consciousness_score = np.full(levels.shape, -1, dtype=np.int8)
+        consciousness_score[known] = _CONSCIOUSNESS_SCORES[codes[known]]
+        invalid = consciousness_score < 0
+        if invalid.any():
+            level = levels[np.argmax(invalid)]
+            raise ValueError(f"Invalid consciousness level: {level}. "
+                           f"Must be one of {list(self.CONSCIOUSNESS_LEVELS.keys())}.")
+        
+        scores = {
+            "respiratory_rate": _band_scores(_RR_BINS, _RR_SCORES, respiratory_rate),
+            "oxygen_saturation": _band_scores(_O2_BINS, _O2_SCORES, oxygen_saturation),
+            "supplemental_oxygen": np.where(
+                np.asarray(supplemental_oxygen, dtype=bool), _O2_THERAPY_SCORE, 0
+            ),
+            "systolic_bp": _band_scores(_BP_BINS, _BP_SCORES, systolic_bp),
+            "pulse": _band_scores(_PULSE_BINS, _PULSE_SCORES, pulse),
+            "consciousness": consciousness_score.astype(np.int64),
+            "temperature": _band_scores(_TEMP_BINS, _TEMP_SCORES, temperature),
         }
+        scores["total"] = np.add.reduce(list(scores.values()))
+        return scores
     
     def _determine_risk_category(
         self,
@@ -362,6 +436,23 @@ class FuzzyNEWS2:
         Returns:
             NEWS2Result object containing scores, risk category, and recommended response
         """
+        calculate = self._calculate if self._calculate_cached is None else self._calculate_cached
+        return calculate(
+            respiratory_rate, oxygen_saturation, systolic_bp, pulse,
+            consciousness, temperature, supplemental_oxygen
+        )
+    
+    def _calculate(
+        self,
+        respiratory_rate: int,
+        oxygen_saturation: int,
+        systolic_bp: int,
+        pulse: int,
+        consciousness: str,
+        temperature: float,
+        supplemental_oxygen: bool
+    ) -> NEWS2Result:
+        """Calculate the NEWS-2 score without consulting the result cache."""
         # Calculate crisp NEWS-2 score
         crisp_scores = self._calculate_crisp_score(
             respiratory_rate=respiratory_rate,
@@ -382,32 +473,20 @@ class FuzzyNEWS2:
             "temperature": temperature
         }
         
-        # Add supplemental oxygen and consciousness level to crisp scores
-        fuzzy_scores = dict(crisp_scores)
-        
-        try:
-            # Compute fuzzy result
-            fuzzy_result = self.fuzzy_system.compute(fuzzy_inputs)
-            fuzzy_score = fuzzy_result["score"]
-            
-            # Add supplemental oxygen score to fuzzy score (handled as crisp)
-            if supplemental_oxygen:
-                fuzzy_score += 2
-            
-            # Add consciousness score to fuzzy score (handled as crisp)
-            if consciousness in self.CONSCIOUSNESS_LEVELS:
-                fuzzy_score += self.CONSCIOUSNESS_LEVELS[consciousness]
-        except Exception as e:
-            # Fallback to crisp score if fuzzy computation fails
-            fuzzy_score = crisp_scores["total"]
+        if self._use_fuzzy_fallback:
+            try:
+                fuzzy_score = self._fuzzy_score(fuzzy_inputs, crisp_scores, supplemental_oxygen)
+            except Exception:
+                # Fallback to crisp score if fuzzy computation fails
+                fuzzy_score = crisp_scores["total"]
+        else:
+            fuzzy_score = self._fuzzy_score(fuzzy_inputs, crisp_scores, supplemental_oxygen)
         
         # Get fuzzy membership values for each input
         fuzzy_memberships = {}
         
         # Determine risk category
-        any_param_score_3 = any(
-            v == 3 for k, v in crisp_scores.items() if k != "total"
-        )
+        any_param_score_3 = 3 in crisp_scores._arr[:-1].tolist()
         
         risk_category = self._determine_risk_category(
             crisp_scores["total"], fuzzy_score, any_param_score_3
@@ -424,3 +503,156 @@ class FuzzyNEWS2:
             parameter_scores=crisp_scores,
             fuzzy_memberships=fuzzy_memberships
         )
+
+
+@lru_cache(maxsize=None)
+def _shared_fuzzy_system(defuzzification: str) -> FuzzyLogic:
+    """
+    Build the NEWS-2 fuzzy system, once per process and defuzzification method.
+    
+    The system is never modified after it is built and its compute() keeps
+    no per-call state, so every FuzzyNEWS2 instance shares it.
+    """
+    fuzzy_system = FuzzyLogic(defuzzification)
+    
+    # Define universes for input variables. They are stored in single
+    # precision; the fractional ranges are generated in double precision
+    # first because a float32 arange accumulates rounding error.
+    respiratory_rate_universe = np.arange(0, 50, 1, dtype=np.float32)
+    oxygen_saturation_universe = np.arange(70, 101, 1, dtype=np.float32)
+    systolic_bp_universe = np.arange(50, 250, 1, dtype=np.float32)
+    pulse_universe = np.arange(20, 180, 1, dtype=np.float32)
+    temperature_universe = np.arange(33, 43, 0.1).astype(np.float32)
+    
+    # Define universe for output variable (NEWS-2 score)
+    score_universe = np.arange(0, 21, 0.1).astype(np.float32)
+    
+    # Define membership functions for respiratory rate
+    resp_rate_mfs = {
+        "normal": {"type": "trimf", "params": [8, 12, 20]},
+        "low": {"type": "trapmf", "params": [0, 0, 8, 12]},
+        "high": {"type": "trapmf", "params": [20, 24, 50, 50]},
+        "very_high": {"type": "trapmf", "params": [24, 30, 50, 50]}
+    }
+    
+    # Define membership functions for oxygen saturation
+    oxygen_sat_mfs = {
+        "normal": {"type": "trapmf", "params": [96, 98, 100, 100]},
+        "low": {"type": "trimf", "params": [94, 95, 96]},
+        "very_low": {"type": "trapmf", "params": [70, 70, 92, 94]}
+    }
+    
+    # Define membership functions for systolic blood pressure
+    systolic_bp_mfs = {
+        "normal": {"type": "trimf", "params": [111, 130, 219]},
+        "low": {"type": "trimf", "params": [101, 105, 111]},
+        "very_low": {"type": "trapmf", "params": [50, 50, 90, 101]},
+        "high": {"type": "trapmf", "params": [219, 230, 250, 250]}
+    }
+    
+    # Define membership functions for pulse rate
+    pulse_mfs = {
+        "normal": {"type": "trimf", "params": [51, 70, 90]},
+        "low": {"type": "trapmf", "params": [20, 20, 40, 51]},
+        "high": {"type": "trimf", "params": [90, 110, 130]},
+        "very_high": {"type": "trapmf", "params": [130, 140, 180, 180]}
+    }
+    
+    # Define membership functions for temperature
+    temperature_mfs = {
+        "normal": {"type": "trimf", "params": [36.1, 37.0, 38.0]},
+        "low": {"type": "trimf", "params": [35.1, 35.5, 36.1]},
+        "very_low": {"type": "trapmf", "params": [33.0, 33.0, 35.0, 35.1]},
+        "high": {"type": "trimf", "params": [38.0, 38.5, 39.0]},
+        "very_high": {"type": "trapmf", "params": [39.0, 39.5, 43.0, 43.0]}
+    }
+    
+    # Define membership functions for NEWS-2 score
+    score_mfs = {
+        "low": {"type": "trimf", "params": [0, 1, 4]},
+        "medium": {"type": "trimf", "params": [4, 6, 7]},
+        "high": {"type": "trapmf", "params": [7, 9, 20, 20]}
+    }
+    
+    # Create antecedents
+    fuzzy_system._create_antecedent(
+        "respiratory_rate", respiratory_rate_universe, resp_rate_mfs
+    )
+    
+    fuzzy_system._create_antecedent(
+        "oxygen_saturation", oxygen_saturation_universe, oxygen_sat_mfs
+    )
+    
+    fuzzy_system._create_antecedent(
+        "systolic_bp", systolic_bp_universe, systolic_bp_mfs
+    )
+    
+    fuzzy_system._create_antecedent(
+        "pulse", pulse_universe, pulse_mfs
+    )
+    
+    fuzzy_system._create_antecedent(
+        "temperature", temperature_universe, temperature_mfs
+    )
+    
+    # Create consequent
+    fuzzy_system._create_consequent(
+        "score", score_universe, score_mfs
+    )
+    
+    # Define rules
+    add_rule = fuzzy_system.add_rule_direct
+    rules = [
+        # Respiratory rate rules
+        add_rule({"respiratory_rate": "normal"}, ("score", "low")),
+        add_rule({"respiratory_rate": "low"}, ("score", "medium")),
+        add_rule({"respiratory_rate": "high"}, ("score", "medium")),
+        add_rule({"respiratory_rate": "very_high"}, ("score", "high")),
+        
+        # Oxygen saturation rules
+        add_rule({"oxygen_saturation": "normal"}, ("score", "low")),
+        add_rule({"oxygen_saturation": "low"}, ("score", "medium")),
+        add_rule({"oxygen_saturation": "very_low"}, ("score", "high")),
+        
+        # Systolic BP rules
+        add_rule({"systolic_bp": "normal"}, ("score", "low")),
+        add_rule({"systolic_bp": "low"}, ("score", "medium")),
+        add_rule({"systolic_bp": "very_low"}, ("score", "high")),
+        add_rule({"systolic_bp": "high"}, ("score", "medium")),
+        
+        # Pulse rules
+        add_rule({"pulse": "normal"}, ("score", "low")),
+        add_rule({"pulse": "low"}, ("score", "medium")),
+        add_rule({"pulse": "high"}, ("score", "medium")),
+        add_rule({"pulse": "very_high"}, ("score", "high")),
+        
+        # Temperature rules
+        add_rule({"temperature": "normal"}, ("score", "low")),
+        add_rule({"temperature": "low"}, ("score", "medium")),
+        add_rule({"temperature": "very_low"}, ("score", "high")),
+        add_rule({"temperature": "high"}, ("score", "medium")),
+        add_rule({"temperature": "very_high"}, ("score", "high")),
+        
+        # Combination rules
+        add_rule({"respiratory_rate": "high", "oxygen_saturation": "low"}, ("score", "high")),
+        add_rule({"pulse": "high", "respiratory_rate": "high"}, ("score", "high")),
+        add_rule({"systolic_bp": "low", "pulse": "high"}, ("score", "high")),
+    ]
+    
+    # Exact readings to precompute memberships for: every whole number in
+    # the validated ranges and temperatures to one decimal place
+    input_grids = {
+        "respiratory_rate": range(0, 51),
+        "oxygen_saturation": range(70, 101),
+        "systolic_bp": range(50, 251),
+        "pulse": range(20, 181),
+        "temperature": [round(33 + i / 10, 1) for i in range(101)],
+    }
+    
+    # Build the control system
+    fuzzy_system.build_control_system(rules, input_grids)
+    return fuzzy_system
+
+
+# Build the default system at import, before any worker processes fork
+_shared_fuzzy_system("centroid")
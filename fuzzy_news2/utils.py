@@ -2,10 +2,81 @@
 Utility functions for the fuzzy-news2 package.
 """
 
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 import json
 import os
+import time
+import uuid
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional here; fall back to the standard library
+    orjson = None
+
+
+# Risk categories in the order used for the assessment log's "risk" field
+RISK_CATEGORIES = ("Low", "Low-Medium", "Medium", "High")
+
+# Parameter scores in the order used for the assessment log's "params" field
+PARAMETER_NAMES = (
+    "respiratory_rate",
+    "oxygen_saturation",
+    "supplemental_oxygen",
+    "systolic_bp",
+    "pulse",
+    "consciousness",
+    "temperature",
+    "total",
+)
+
+# Fixed-size record of the append-only per-patient assessment log
+ASSESSMENT_RECORD = np.dtype([
+    ("ts", "<f8"),              # POSIX seconds, NaN if unknown
+    ("crisp", "<i2"),           # Crisp NEWS-2 score
+    ("fuzzy", "<f8"),           # Fuzzy NEWS-2 score
+    ("risk", "u1"),             # Index into RISK_CATEGORIES, 255 if unknown
+    ("params", "<i2", (len(PARAMETER_NAMES),)),  # Parameter scores, -1 if missing
+])
+
+# Maximum number of assessment logs kept mapped in memory. Each mapping holds
+# a file descriptor open, so this stays well below the usual limit of 1024
+ASSESSMENT_LOG_CACHE_SIZE = 64
+
+# Mapped assessment logs: {path: ((mtime_ns, size), records)}, least recently
+# used first
+_assessment_log_cache: "OrderedDict[str, Tuple[Tuple[int, int], np.ndarray]]" = OrderedDict()
+
+# Last (POSIX second, ISO date-time prefix) formatted by _iso_timestamp
+_iso_second: Tuple[int, str] = (-1, "")
+
+
+def _json_default(obj):
+    """Convert NumPy scalars and arrays, which orjson doesn't take by default."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize an object to JSON bytes, indented by two spaces if requested."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option)
+    return json.dumps(obj, default=_json_default, indent=2 if indent else None).encode()
+
+
+def _loads(data: bytes):
+    """Deserialize JSON bytes; invalid input raises json.JSONDecodeError."""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def validate_range(value: Union[int, float], min_value: Union[int, float], 
@@ -32,6 +103,40 @@ def validate_range(value: Union[int, float], min_value: Union[int, float],
     return value
 
 
+# Accepted ranges of the numeric vital signs as (name, minimum, maximum), in
+# validate_vitals argument order
+VITAL_RANGES = (
+    ("Respiratory rate", 0, 50),
+    ("Oxygen saturation", 70, 100),
+    ("Systolic blood pressure", 50, 250),
+    ("Pulse rate", 20, 180),
+    ("Temperature", 33.0, 43.0),
+)
+
+
+def validate_vitals(respiratory_rate: int, oxygen_saturation: int, systolic_bp: int,
+                    pulse: int, temperature: float) -> None:
+    """
+    Validate all numeric vital signs against VITAL_RANGES in one call.
+    
+    Args:
+        respiratory_rate: Breaths per minute
+        oxygen_saturation: O2 saturation (%)
+        systolic_bp: Systolic blood pressure (mmHg)
+        pulse: Pulse rate (beats per minute)
+        temperature: Body temperature (°C)
+    
+    Raises:
+        ValueError: If a value is not within its range, for the first such value
+    """
+    values = (respiratory_rate, oxygen_saturation, systolic_bp, pulse, temperature)
+    for value, (param_name, min_value, max_value) in zip(values, VITAL_RANGES):
+        if value < min_value or value > max_value:
+            raise ValueError(
+                f"{param_name} must be between {min_value} and {max_value}, got {value}"
+            )
+
+
 def validate_consciousness(value: str) -> str:
     """
     Validate the consciousness level value.
@@ -64,18 +169,57 @@ def format_result(result_dict: Dict, include_timestamp: bool = True) -> Dict:
     Returns:
         Formatted result dictionary
     """
-    formatted = result_dict.copy()
-    
     if include_timestamp:
-        formatted["timestamp"] = datetime.now().isoformat()
+        return {**result_dict, "timestamp": _iso_timestamp(time.time_ns())}
+    
+    return result_dict.copy()
+
+
+def _iso_timestamp(time_ns: int) -> str:
+    """
+    Format a POSIX time in nanoseconds like datetime.isoformat() in local time.
+    
+    The date and time up to the second are only formatted once per second;
+    the microseconds are appended to the cached prefix.
+    """
+    global _iso_second
+    
+    seconds, nanoseconds = divmod(time_ns, 1_000_000_000)
+    if _iso_second[0] != seconds:
+        _iso_second = (
+            seconds, datetime.fromtimestamp(seconds).strftime("%Y-%m-%dT%H:%M:%S")
+        )
+    
+    # isoformat() leaves out a zero microsecond field
+    microseconds = nanoseconds // 1000
+    if microseconds:
+        return f"{_iso_second[1]}.{microseconds:06d}"
+    return _iso_second[1]
+
+
+def _with_epoch(result: Dict) -> Dict:
+    """
+    Add a "ts_epoch" field (POSIX seconds) for the result's ISO timestamp.
     
-    return formatted
+    Results that already carry "ts_epoch", or have no timestamp or one that
+    isn't ISO 8601, are returned unchanged.
+    """
+    if "ts_epoch" in result or "timestamp" not in result:
+        return result
+    try:
+        ts_epoch = datetime.fromisoformat(result["timestamp"]).timestamp()
+    except (TypeError, ValueError):
+        return result
+    return {**result, "ts_epoch": ts_epoch}
 
 
 def save_result(result: Dict, patient_id: str, file_path: Optional[str] = None) -> str:
     """
     Save a result to a JSON file.
     
+    The timestamp is also stored as "ts_epoch" so readers don't have to
+    parse it.
+    
     Args:
         result: Result dictionary to save
         patient_id: ID of the patient
@@ -89,12 +233,51 @@ def save_result(result: Dict, patient_id: str, file_path: Optional[str] = None)
         data_dir = os.path.join(os.getcwd(), "data")
         os.makedirs(data_dir, exist_ok=True)
         
-        # Generate a filename based on patient ID and timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = os.path.join(data_dir, f"{patient_id}_{timestamp}.json")
+        # Generate a filename based on patient ID and timestamp. Results are
+        # saved concurrently, so the timestamp has microseconds and a random
+        # suffix keeps saves within one clock tick apart
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        file_path = os.path.join(
+            data_dir, f"{patient_id}_{timestamp}_{uuid.uuid4().hex[:8]}.json"
+        )
+    
+    with open(file_path, "wb") as f:
+        f.write(_dumps(_with_epoch(result), indent=True))
+    
+    _index_result_file(file_path, patient_id, result.get("timestamp"))
+    
+    return file_path
+
+
+def save_results(results: List[Dict], patient_id: str, file_path: Optional[str] = None) -> str:
+    """
+    Save several results for one patient to a single JSON file.
+    
+    The file holds a JSON list and is read back by get_patient_history.
+    
+    Args:
+        results: Result dictionaries to save
+        patient_id: ID of the patient
+        file_path: Path to the file to save to (optional)
+    
+    Returns:
+        Path to the saved file
+    """
+    if file_path is None:
+        # Create a data directory if it doesn't exist
+        data_dir = os.path.join(os.getcwd(), "data")
+        os.makedirs(data_dir, exist_ok=True)
+        
+        # Generate a filename based on patient ID and timestamp; batches use
+        # microseconds so consecutive batches don't overwrite each other
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        file_path = os.path.join(data_dir, f"{patient_id}_{timestamp}_batch.json")
+    
+    with open(file_path, "wb") as f:
+        f.write(_dumps([_with_epoch(result) for result in results], indent=True))
     
-    with open(file_path, "w") as f:
-        json.dump(result, f, indent=2)
+    timestamps = [result["timestamp"] for result in results if "timestamp" in result]
+    _index_result_file(file_path, patient_id, max(timestamps, default=None))
     
     return file_path
 
@@ -113,16 +296,104 @@ def load_result(file_path: str) -> Dict:
         FileNotFoundError: If the file doesn't exist
         json.JSONDecodeError: If the file isn't valid JSON
     """
-    with open(file_path, "r") as f:
-        result = json.load(f)
+    with open(file_path, "rb") as f:
+        result = _loads(f.read())
     
     return result
 
 
+def _history_index_path(patient_id: str, data_dir: str) -> str:
+    """Return the path of a patient's history index in a data directory."""
+    return os.path.join(data_dir, ".idx", f"{patient_id}.jsonl")
+
+
+def history_index_version(patient_id: str, data_dir: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """
+    Return the (modification time in ns, size) of a patient's history index.
+    
+    Every save_result and save_results call appends to the index, so the
+    version changes with the patient's history; None if there is no index.
+    """
+    if data_dir is None:
+        data_dir = os.path.join(os.getcwd(), "data")
+    try:
+        stat = os.stat(_history_index_path(patient_id, data_dir))
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _is_history_file(filename: str, patient_id: str) -> bool:
+    """Whether a file name belongs to a patient's assessment history."""
+    return filename.startswith(f"{patient_id}_") and filename.endswith(".json")
+
+
+def _scan_history_files(patient_id: str, data_dir: str) -> List[str]:
+    """List the names of a patient's result files by scanning a directory."""
+    with os.scandir(data_dir) as entries:
+        return [entry.name for entry in entries if _is_history_file(entry.name, patient_id)]
+
+
+def _index_result_file(file_path: str, patient_id: str, timestamp: Optional[str]) -> None:
+    """
+    Record a saved result file in its patient's history index.
+    
+    The index is a JSON-lines file next to the results, one
+    {"t": timestamp, "p": file name} line per saved file, so that
+    get_patient_history doesn't have to scan the whole directory. The first
+    save for a patient seeds the index from a scan so earlier files stay
+    in the history. Files whose names get_patient_history wouldn't match
+    are not indexed.
+    """
+    data_dir, filename = os.path.split(os.path.abspath(file_path))
+    if not _is_history_file(filename, patient_id):
+        return
+    
+    index_path = _history_index_path(patient_id, data_dir)
+    if os.path.exists(index_path):
+        entries = [{"t": timestamp, "p": filename}]
+    else:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        entries = [
+            {"t": timestamp if name == filename else None, "p": name}
+            for name in _scan_history_files(patient_id, data_dir)
+        ]
+    
+    with open(index_path, "ab") as f:
+        f.write(b"".join(_dumps(entry) + b"\n" for entry in entries))
+
+
+def _indexed_history_files(patient_id: str, data_dir: str) -> Optional[List[str]]:
+    """
+    Read the names of a patient's result files from the history index.
+    
+    Returns:
+        File names in the order they were saved, without duplicates, or None
+        if the patient has no index
+    """
+    try:
+        with open(_history_index_path(patient_id, data_dir), "rb") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    
+    filenames = {}
+    for line in lines:
+        try:
+            filenames[_loads(line)["p"]] = None
+        except (json.JSONDecodeError, KeyError, TypeError):
+            # Skip a line left partial by an interrupted write
+            continue
+    return list(filenames)
+
+
 def get_patient_history(patient_id: str, data_dir: Optional[str] = None) -> List[Dict]:
     """
     Get the history of assessments for a patient.
     
+    Result files are found through the patient's history index when there
+    is one, and otherwise by scanning the directory.
+    
     Args:
         patient_id: ID of the patient
         data_dir: Directory to search for assessment files
@@ -136,19 +407,185 @@ def get_patient_history(patient_id: str, data_dir: Optional[str] = None) -> List
     if not os.path.exists(data_dir):
         return []
     
+    filenames = _indexed_history_files(patient_id, data_dir)
+    if filenames is None:
+        filenames = _scan_history_files(patient_id, data_dir)
+    
     results = []
     
-    for filename in os.listdir(data_dir):
-        if filename.startswith(f"{patient_id}_") and filename.endswith(".json"):
-            file_path = os.path.join(data_dir, filename)
-            try:
-                result = load_result(file_path)
-                results.append(result)
-            except (json.JSONDecodeError, KeyError):
-                # Skip invalid files
-                continue
+    for filename in filenames:
+        file_path = os.path.join(data_dir, filename)
+        try:
+            result = load_result(file_path)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            # Skip invalid files, and files removed since they were indexed
+            continue
+        
+        # Batch files hold a list of results
+        if isinstance(result, list):
+            results.extend(result)
+        else:
+            results.append(result)
     
     # Sort by timestamp if available
     results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
     
     return results
+
+
+def get_patient_history_arrays(patient_id: str, data_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Get the history of assessments for a patient as NumPy columns.
+    
+    Args:
+        patient_id: ID of the patient
+        data_dir: Directory to search for assessment files
+    
+    Reads the patient's binary assessment log when there is one, and
+    otherwise falls back to the JSON result files.
+    
+    Returns:
+        Dictionary with "crisp_score", "fuzzy_score" and "timestamp" (POSIX
+        seconds, NaN where a stored timestamp can't be parsed) arrays,
+        ordered like get_patient_history (newest first)
+    """
+    log = load_assessment_log(patient_id, data_dir)
+    if log is not None:
+        log = log[np.argsort(log["ts"], kind="stable")[::-1]]
+        return {
+            "crisp_score": log["crisp"].astype(np.int64),
+            "fuzzy_score": log["fuzzy"],
+            "timestamp": log["ts"],
+        }
+    
+    history = get_patient_history(patient_id, data_dir)
+    
+    return {
+        "crisp_score": np.array(
+            [assessment["crisp_score"] for assessment in history], dtype=np.int64
+        ),
+        "fuzzy_score": np.array(
+            [assessment["fuzzy_score"] for assessment in history], dtype=np.float64
+        ),
+        "timestamp": np.array(
+            [_with_epoch(assessment).get("ts_epoch", np.nan) for assessment in history],
+            dtype=np.float64
+        ),
+    }
+
+
+def _assessment_log_path(patient_id: str, data_dir: Optional[str] = None) -> str:
+    """Return the path of a patient's assessment log."""
+    if data_dir is None:
+        data_dir = os.path.join(os.getcwd(), "data")
+    return os.path.join(data_dir, f"{patient_id}.bin")
+
+
+def append_assessment_log(results: List[Dict], patient_id: str,
+                          data_dir: Optional[str] = None) -> str:
+    """
+    Append results to a patient's binary assessment log.
+    
+    Each result becomes one fixed-size ASSESSMENT_RECORD, so the whole log
+    can be read back as one array. Creating a patient's log seeds it from
+    their JSON history so assessments saved before the log stay in its
+    statistics; results in that history with the same timestamp as one
+    being appended (i.e. the same assessment, already saved) are skipped.
+    
+    Args:
+        results: Result dictionaries to append
+        patient_id: ID of the patient
+        data_dir: Directory holding the log (defaults to ./data)
+    
+    Returns:
+        Path to the log file
+    """
+    log_path = _assessment_log_path(patient_id, data_dir)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    
+    if not os.path.exists(log_path):
+        # Oldest first, skipping results the log has no fields for
+        appended = {_with_epoch(result).get("ts_epoch") for result in results}
+        earlier = [
+            saved for saved in map(_with_epoch, reversed(get_patient_history(patient_id, data_dir)))
+            if {"ts_epoch", "crisp_score", "fuzzy_score"} <= saved.keys()
+            and saved["ts_epoch"] not in appended
+        ]
+        results = earlier + list(results)
+    
+    records = np.zeros(len(results), dtype=ASSESSMENT_RECORD)
+    for record, result in zip(records, results):
+        scores = result.get("parameter_scores", {})
+        risk = result.get("risk_category")
+        record["ts"] = _with_epoch(result).get("ts_epoch", np.nan)
+        record["crisp"] = result["crisp_score"]
+        record["fuzzy"] = result["fuzzy_score"]
+        record["risk"] = RISK_CATEGORIES.index(risk) if risk in RISK_CATEGORIES else 255
+        record["params"] = [scores.get(name, -1) for name in PARAMETER_NAMES]
+    
+    # Release any mapping of the log before it grows
+    _assessment_log_cache.pop(log_path, None)
+    
+    with open(log_path, "ab") as f:
+        # Drop a partial record left by an interrupted write so later
+        # records stay aligned
+        remainder = f.tell() % ASSESSMENT_RECORD.itemsize
+        if remainder:
+            f.truncate(f.tell() - remainder)
+        f.write(records.tobytes())
+    
+    return log_path
+
+
+def assessment_log_version(patient_id: str, data_dir: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """
+    Return the (modification time in ns, size) of a patient's assessment log.
+    
+    The version changes whenever results are appended, so it can key
+    anything derived from the log; None if the patient has no log.
+    """
+    try:
+        stat = os.stat(_assessment_log_path(patient_id, data_dir))
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_assessment_log(patient_id: str, data_dir: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Load a patient's binary assessment log.
+    
+    Args:
+        patient_id: ID of the patient
+        data_dir: Directory holding the log (defaults to ./data)
+    
+    Logs are memory-mapped read-only and kept in a bounded LRU cache,
+    revalidated against the file's modification time and size.
+    
+    Returns:
+        Structured array of ASSESSMENT_RECORD in append order, or None if
+        the patient has no log
+    """
+    log_path = _assessment_log_path(patient_id, data_dir)
+    try:
+        stat = os.stat(log_path)
+    except FileNotFoundError:
+        _assessment_log_cache.pop(log_path, None)
+        return None
+    
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _assessment_log_cache.get(log_path)
+    if cached is not None and cached[0] == version:
+        _assessment_log_cache.move_to_end(log_path)
+        return cached[1]
+    
+    count = stat.st_size // ASSESSMENT_RECORD.itemsize
+    if count:
+        records = np.memmap(log_path, dtype=ASSESSMENT_RECORD, mode="r", shape=(count,))
+    else:
+        records = np.zeros(0, dtype=ASSESSMENT_RECORD)
+    
+    _assessment_log_cache[log_path] = (version, records)
+    if len(_assessment_log_cache) > ASSESSMENT_LOG_CACHE_SIZE:
+        _assessment_log_cache.popitem(last=False)
+    return records
@@ -2,22 +2,23 @@
 Shared test fixtures for the fuzzy-news2 package.
 """
 
-import os
-import tempfile
-import json
 import pytest
 from datetime import datetime, timedelta
 
 from fuzzy_news2 import FuzzyNEWS2
+from fuzzy_news2.utils import _dumps
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def fuzzy_news():
-    """Create a FuzzyNEWS2 instance for testing."""
+    """Create a FuzzyNEWS2 instance shared by all tests.
+    
+    Tests that need to modify the calculator should build their own.
+    """
     return FuzzyNEWS2()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def normal_vitals():
     """Normal vital signs for testing."""
     return {
@@ -31,7 +32,7 @@ def normal_vitals():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def abnormal_vitals():
     """Abnormal vital signs for testing."""
     return {
@@ -45,7 +46,7 @@ def abnormal_vitals():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def borderline_vitals():
     """Borderline vital signs for testing."""
     return {
@@ -60,24 +61,15 @@ def borderline_vitals():
 
 
 @pytest.fixture
-def temp_data_dir():
-    """Create a temporary data directory for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Set up environment to use this as the data directory
-        original_cwd = os.getcwd()
-        try:
-            # Create data subdirectory
-            data_dir = os.path.join(temp_dir, "data")
-            os.makedirs(data_dir, exist_ok=True)
-            
-            # Change working directory to temp directory
-            os.chdir(temp_dir)
-            
-            yield data_dir
-        
-        finally:
-            # Reset working directory
-            os.chdir(original_cwd)
+def temp_data_dir(tmp_path):
+    """Create a temporary data directory for testing.
+    
+    The working directory is left alone; pass the returned path to the
+    code under test.
+    """
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    return str(data_dir)
 
 
 @pytest.fixture
@@ -111,15 +103,15 @@ def sample_patient_history(temp_data_dir):
             }
         }
         
-        # Save record to file
-        filename = f"{patient_id}_{timestamp.replace(':', '-')}.json"
-        file_path = os.path.join(temp_data_dir, filename)
-        
-        with open(file_path, "w") as f:
-            json.dump(record, f)
-        
         history.append(record)
     
+    # Save all records to one history file, which get_patient_history reads
+    # as a JSON list like the files written by save_results; temp_data_dir
+    # comes from tmp_path and never ends in a separator
+    file_path = f"{temp_data_dir}/{patient_id}_history.json"
+    with open(file_path, "wb") as f:
+        f.write(_dumps(history))
+    
     return {
         "patient_id": patient_id,
         "records": history,
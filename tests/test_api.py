@@ -2,19 +2,50 @@
 Tests for the API endpoints.
 """
 
+import asyncio
 import json
 import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+import httpx
+import numpy as np
 import pytest
-from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 
-from fuzzy_news2.api import app
+from fuzzy_news2.api import app, _calc_cached, _get_executor
+from fuzzy_news2 import api
+from fuzzy_news2.utils import append_assessment_log, save_result
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the API."""
-    return TestClient(app)
+    """Create a test client for the API, shared by the whole session.
+    
+    Entering the client runs the app's lifespan, so startup and shutdown
+    happen once.
+    """
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    """Create the directory the API saves results under, shared by the session."""
+    return tmp_path_factory.mktemp("api")
+
+
+@pytest.fixture(autouse=True)
+def in_data_dir(data_dir, monkeypatch):
+    """Run each test from the session's directory so results stay out of the tree."""
+    monkeypatch.chdir(data_dir)
+
+
+@pytest.fixture
+def patient_id():
+    """Create a patient ID that no other test writes history for."""
+    return f"TEST-{uuid.uuid4().hex}"
 
 
 @pytest.fixture
@@ -86,6 +117,62 @@ def test_calculate_abnormal(client, abnormal_vitals):
     assert data["crisp_score"] > 0
 
 
+def _worker_cache_hit(vitals):
+    """Calculate vitals twice in the current process; whether the second hit the cache."""
+    first_result = _calc_cached(*vitals)
+    hits = _calc_cached.cache_info().hits
+    return _calc_cached(*vitals) is first_result and _calc_cached.cache_info().hits == hits + 1
+
+
+def test_calculate_repeat_vitals_cached(client, sample_vitals):
+    """Test that repeated vital signs reuse the cached calculation."""
+    # Requests are calculated in the pool workers, so check their cache
+    vitals = tuple(v for k, v in sample_vitals.items() if k != "patient_id")
+    assert _get_executor().submit(_worker_cache_hit, vitals).result()
+    
+    # Repeated requests give identical scores
+    first = client.post("/api/calculate", json=sample_vitals)
+    second = client.post("/api/calculate", json=sample_vitals)
+    assert second.status_code == 200
+    assert second.json()["crisp_score"] == first.json()["crisp_score"]
+    assert second.json()["fuzzy_score"] == first.json()["fuzzy_score"]
+
+
+def test_calculate_after_worker_crash(client, sample_vitals):
+    """Test that calculations recover when a pool worker dies."""
+    # A worker exiting breaks the whole pool
+    with pytest.raises(BrokenProcessPool):
+        _get_executor().submit(os._exit, 1).result()
+    
+    response = client.post("/api/calculate", json=sample_vitals)
+    assert response.status_code == 200
+    
+    response = client.post("/api/calculate_batch", json={"vitals": [sample_vitals]})
+    assert response.status_code == 200
+
+
+def test_calculate_batch(client, sample_vitals, abnormal_vitals):
+    """Test batch calculation of several assessments."""
+    other_vitals = dict(sample_vitals, patient_id="TEST-BATCH-002")
+    batch = {"vitals": [abnormal_vitals, other_vitals, sample_vitals]}
+    
+    response = client.post("/api/calculate_batch", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    
+    # Results preserve the input order
+    assert [item["patient_id"] for item in data] == [
+        "TEST-001", "TEST-BATCH-002", "TEST-001"
+    ]
+    assert data[0]["risk_category"] in ["Medium", "High"]
+    assert data[2]["risk_category"] in ["Low", "Low-Medium"]
+    
+    # Batch results are saved to the patient's history
+    response = client.get("/api/history/TEST-BATCH-002")
+    assert response.status_code == 200
+    assert len(response.json()) >= 1
+
+
 def test_validation(client, sample_vitals):
     """Test input validation."""
     # Test invalid respiratory rate
@@ -103,37 +190,56 @@ def test_validation(client, sample_vitals):
     assert response.status_code == 400
 
 
-def test_get_history(client, sample_vitals, abnormal_vitals):
+def test_get_history(client, sample_vitals, abnormal_vitals, patient_id):
     """Test retrieving patient history."""
-    # Create some history by making multiple calculations
-    client.post("/api/calculate", json=sample_vitals)
-    client.post("/api/calculate", json=abnormal_vitals)
+    # Create some history by making multiple calculations in one batch
+    client.post("/api/calculate_batch", json={"vitals": [
+        dict(sample_vitals, patient_id=patient_id),
+        dict(abnormal_vitals, patient_id=patient_id),
+    ]})
     
     # Get history
-    response = client.get(f"/api/history/{sample_vitals['patient_id']}")
+    response = client.get(f"/api/history/{patient_id}")
     assert response.status_code == 200
     
     data = response.json()
     assert isinstance(data, list)
-    assert len(data) >= 2  # Should have at least the two we just created
+    assert len(data) == 2  # Exactly the two we just created
     
     # Verify data is sorted by timestamp (most recent first)
-    timestamps = [datetime.fromisoformat(item["timestamp"]) for item in data]
-    assert all(timestamps[i] >= timestamps[i+1] for i in range(len(timestamps)-1))
+    timestamps = np.array([item["timestamp"] for item in data], dtype="datetime64[ns]")
+    assert np.all(np.diff(timestamps.astype(np.int64)) <= 0)
 
 
-def test_get_statistics(client, sample_vitals, abnormal_vitals):
-    """Test retrieving patient statistics."""
-    # Create some history
+def test_history_response_fields(client, sample_vitals):
+    """Test that history items expose only the response model fields."""
     client.post("/api/calculate", json=sample_vitals)
-    client.post("/api/calculate", json=abnormal_vitals)
+    
+    response = client.get(f"/api/history/{sample_vitals['patient_id']}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    
+    item = response.json()[0]
+    assert set(item) == {
+        "patient_id", "timestamp", "crisp_score", "fuzzy_score",
+        "risk_category", "recommended_response", "parameter_scores"
+    }
+
+
+def test_get_statistics(client, sample_vitals, abnormal_vitals, patient_id):
+    """Test retrieving patient statistics."""
+    # Create some history, in one batch as in test_get_history
+    client.post("/api/calculate_batch", json={"vitals": [
+        dict(sample_vitals, patient_id=patient_id),
+        dict(abnormal_vitals, patient_id=patient_id),
+    ]})
     
     # Get statistics
-    response = client.get(f"/api/statistics/{sample_vitals['patient_id']}")
+    response = client.get(f"/api/statistics/{patient_id}")
     assert response.status_code == 200
     
     data = response.json()
-    assert data["patient_id"] == sample_vitals["patient_id"]
+    assert data["patient_id"] == patient_id
     assert "assessments_count" in data
     assert "average_crisp_score" in data
     assert "average_fuzzy_score" in data
@@ -141,22 +247,74 @@ def test_get_statistics(client, sample_vitals, abnormal_vitals):
     assert "max_fuzzy_score" in data
     assert "trend" in data
     
-    # Should have at least 2 assessments
-    assert data["assessments_count"] >= 2
+    # Should have exactly the 2 assessments
+    assert data["assessments_count"] == 2
 
 
-def test_limit_history(client, sample_vitals):
+def test_statistics_cache_window(client, patient_id):
+    """Test that cached statistics follow the days window and new log records."""
+    # An assessment about to leave the 1-day window, logged directly as
+    # another process would, so the API doesn't know about the write
+    record = {"ts_epoch": time.time() - 24 * 60 * 60 + 0.5, "crisp_score": 2, "fuzzy_score": 2.5}
+    append_assessment_log([record], patient_id)
+    assert client.get(f"/api/statistics/{patient_id}?days=1").json()["assessments_count"] == 1
+    
+    time.sleep(0.6)
+    assert client.get(f"/api/statistics/{patient_id}?days=1").json()["assessments_count"] == 0
+    
+    append_assessment_log([dict(record, ts_epoch=time.time())], patient_id)
+    assert client.get(f"/api/statistics/{patient_id}?days=1").json()["assessments_count"] == 1
+
+
+def test_history_cache_sees_direct_saves(client, sample_vitals, patient_id):
+    """Test that cached history picks up results saved outside the API."""
+    client.post("/api/calculate", json=dict(sample_vitals, patient_id=patient_id))
+    assert len(client.get(f"/api/history/{patient_id}").json()) == 1
+    
+    # Saved as another server process would, without invalidating this one
+    save_result({"patient_id": patient_id, "timestamp": "2024-01-01T12:00:00",
+                 "crisp_score": 0, "fuzzy_score": 0.5}, patient_id)
+    assert len(client.get(f"/api/history/{patient_id}").json()) == 2
+
+
+def test_response_cache_evicts_least_recently_used(monkeypatch):
+    """Test that reading a patient's cached response keeps it from eviction."""
+    monkeypatch.setattr(api, "RESPONSE_CACHE_MAX_PATIENTS", 2)
+    monkeypatch.setattr(api, "_response_cache", OrderedDict())
+    
+    api._set_cached_response("A", ("history", 10), [])
+    api._set_cached_response("B", ("history", 10), [])
+    assert api._get_cached_response("A", ("history", 10), 60) == []
+    api._set_cached_response("C", ("history", 10), [])
+    
+    assert list(api._response_cache) == ["A", "C"]
+
+
+def test_limit_history(client, sample_vitals, patient_id):
     """Test limiting the number of history items returned."""
-    # Create multiple calculations
-    for _ in range(5):
-        client.post("/api/calculate", json=sample_vitals)
+    # Create multiple calculations, sent concurrently straight to the app
+    vitals = dict(sample_vitals, patient_id=patient_id)
+    
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*[
+                async_client.post("/api/calculate", json=vitals) for _ in range(5)
+            ])
+    
+    responses = asyncio.run(post_all())
+    assert all(response.status_code == 200 for response in responses)
     
     # Get history with limit
-    response = client.get(f"/api/history/{sample_vitals['patient_id']}?limit=3")
+    response = client.get(f"/api/history/{patient_id}?limit=3")
     assert response.status_code == 200
     
     data = response.json()
     assert len(data) == 3  # Should respect the limit
+    
+    # Every concurrent calculation was kept, in the history and the statistics
+    assert len(client.get(f"/api/history/{patient_id}").json()) == 5
+    assert client.get(f"/api/statistics/{patient_id}").json()["assessments_count"] == 5
 
 
 def test_days_filter_statistics(client, sample_vitals):
@@ -3,6 +3,7 @@ Basic test for the custom fuzzy logic implementation.
 """
 
 import numpy as np
+import pytest
 import sys
 import os
 
@@ -16,6 +17,12 @@ from fuzzy_news2.custom_fuzzy import (
     create_gaussmf
 )
 
+# Universes shared by the tests; read-only so no test can change them
+_UNIV_100 = np.arange(0, 100, 1)
+_UNIV_100.flags.writeable = False
+_UNIV_10 = np.arange(0, 10, 0.1)
+_UNIV_10.flags.writeable = False
+
 
 def test_basic_fuzzy_system():
     """Test a simple fuzzy system using our custom implementation."""
@@ -23,7 +30,7 @@ def test_basic_fuzzy_system():
     fuzzy_system = CustomFuzzyLogic()
     
     # Create temperature variable
-    temp_universe = np.arange(0, 100, 1)
+    temp_universe = _UNIV_100
     temp = fuzzy_system.create_variable("temperature", temp_universe)
     
     # Add terms to the temperature variable
@@ -32,7 +39,7 @@ def test_basic_fuzzy_system():
     temp.add_term("hot", create_trimf((60, 80, 100)))
     
     # Create comfort variable
-    comfort_universe = np.arange(0, 10, 0.1)
+    comfort_universe = _UNIV_10
     comfort = fuzzy_system.create_variable("comfort", comfort_universe)
     
     # Add terms to the comfort variable
@@ -45,20 +52,281 @@ def test_basic_fuzzy_system():
     fuzzy_system.add_rule({"temperature": "warm"}, ("comfort", "medium"))
     fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "high"))
     
-    # Test with cold temperature
-    result = fuzzy_system.compute({"temperature": 15})
+    # Test cold, warm and hot temperatures in one batch
+    temperatures = np.array([15, 50, 85])
+    result = fuzzy_system.compute({"temperature": temperatures})
     assert "comfort" in result
-    assert result["comfort"] < 4.0  # Should be in the "low" range
+    cold, warm, hot = result["comfort"]
+    assert cold < 4.0  # Should be in the "low" range
+    assert warm >= 4.0 and warm <= 6.0  # Should be in the "medium" range
+    assert hot > 6.0  # Should be in the "high" range
     
-    # Test with warm temperature
-    result = fuzzy_system.compute({"temperature": 50})
-    assert result["comfort"] >= 4.0 and result["comfort"] <= 6.0  # Should be in the "medium" range
+    # Each batch entry matches the scalar computation
+    for temperature, comfort in zip(temperatures.tolist(), result["comfort"]):
+        assert fuzzy_system.compute({"temperature": temperature})["comfort"] == comfort
+
+
+def test_rule_added_after_compute():
+    """Test that rules added after a computation are picked up."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trimf((0, 20, 40)))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("low", create_trimf((0, 2, 4)))
+    comfort.add_term("high", create_trimf((6, 8, 10)))
+    
+    fuzzy_system.add_rule({"temperature": "cold"}, ("comfort", "low"))
     
-    # Test with hot temperature
+    # No rule fires for hot temperatures yet
     result = fuzzy_system.compute({"temperature": 85})
-    assert result["comfort"] > 6.0  # Should be in the "high" range
+    assert result["comfort"] == 0.0
+    
+    fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "high"))
+    
+    result = fuzzy_system.compute({"temperature": 85})
+    assert result["comfort"] > 6.0
+
+
+def test_compile_specialized_matches_compute():
+    """Test that the specialized inference code matches the generic path."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trapmf((0, 0, 20, 40)))
+    temp.add_term("warm", create_gaussmf(50, 10))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    humidity = fuzzy_system.create_variable("humidity", _UNIV_100)
+    humidity.add_term("dry", create_trimf((0, 0, 50)))
+    humidity.add_term("humid", create_trimf((50, 100, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("low", create_trimf((0, 2, 4)))
+    comfort.add_term("medium", create_trimf((3, 5, 7)))
+    comfort.add_term("high", create_trimf((6, 8, 10)))
+    
+    fuzzy_system.add_rule({"temperature": "cold"}, ("comfort", "low"))
+    fuzzy_system.add_rule({"temperature": "warm", "humidity": "dry"}, ("comfort", "high"))
+    fuzzy_system.add_rule({"temperature": "warm", "humidity": "humid"}, ("comfort", "medium"))
+    fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "low"))
+    
+    inputs = [
+        {"temperature": t, "humidity": h}
+        for t in (0, 15, 42.5, 50, 85, 99) for h in (0, 30, 100)
+    ]
+    expected = [fuzzy_system.compute(values) for values in inputs]
+    
+    fuzzy_system.compile_specialized(["temperature", "humidity"])
+    assert fuzzy_system._specialized is not None
+    
+    for values, result in zip(inputs, expected):
+        assert fuzzy_system.compute(values) == result
+    
+    # Precomputed memberships for some of the values give the same results,
+    # both on and off the grid
+    fuzzy_system.compile_specialized(
+        ["temperature", "humidity"],
+        {"temperature": range(0, 100), "humidity": [0.0, 30.0]},
+    )
+    
+    for values, result in zip(inputs, expected):
+        assert fuzzy_system.compute(values) == result
+
+
+def test_term_replaced_after_compile_specialized():
+    """Test that replacing a term's membership function invalidates specialized code."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trimf((0, 20, 40)))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("low", create_trimf((0, 2, 4)))
+    comfort.add_term("high", create_trimf((6, 8, 10)))
+    
+    fuzzy_system.add_rule({"temperature": "cold"}, ("comfort", "low"))
+    fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "high"))
+    fuzzy_system.compile_specialized(["temperature"], {"temperature": [50]})
+    
+    # Nothing is hot at 50 until the term is widened
+    assert fuzzy_system.compute({"temperature": 50})["comfort"] == 0.0
+    temp.add_term("hot", create_trimf((40, 80, 100)))
+    
+    result = fuzzy_system.compute({"temperature": 50})
+    fuzzy_system._specialized = None
+    assert result == fuzzy_system.compute({"temperature": 50})
+    assert result["comfort"] > 6.0
+
+
+def test_single_full_term_uses_cached_centroid():
+    """Test that a lone fully-fired term defuzzifies to its curve's centroid."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trimf((0, 20, 40)))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("low", create_trimf((0, 2, 4)))
+    comfort.add_term("high", create_trapmf((6, 8, 10, 10)))
+    
+    fuzzy_system.add_rule({"temperature": "cold"}, ("comfort", "low"))
+    fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "high"))
+    
+    curve = comfort.term_curves["high"]
+    expected = float(comfort.universe @ curve / curve.sum())
+    assert comfort.term_centroids["high"] == expected
+    assert fuzzy_system.compute({"temperature": 80})["comfort"] == expected
+    
+    # A partially fired term still goes through the full aggregation
+    assert fuzzy_system.compute({"temperature": 70})["comfort"] != expected
+
+
+def test_fuzzify_matches_terms():
+    """Test that block fuzzification matches evaluating each term."""
+    temp = CustomFuzzyLogic().create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trapmf((0, 0, 20, 40)))
+    temp.add_term("warm", create_gaussmf(50, 10))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    temp.add_term("custom", lambda x: np.clip(np.asarray(x, dtype=float) / 100, 0, 1))
+    
+    for x in (0, 10, 20.5, 50, 70, 80, 99.9, 100):
+        expected = [float(mf(x)) for mf in temp.terms.values()]
+        assert temp.fuzzify(x).tolist() == expected
+
+
+def test_variable_dtype():
+    """Test that universes and term curves use the requested dtype."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    single = fuzzy_system.create_variable("single", np.arange(0, 10, 0.5))
+    single.add_term("mid", create_trimf((2, 5, 8)))
+    assert single.universe.dtype == np.float32
+    assert single.curve_matrix.dtype == np.float32
+    
+    double = fuzzy_system.create_variable("double", np.arange(0, 10, 0.5), dtype=np.float64)
+    double.add_term("mid", create_trimf((2, 5, 8)))
+    assert double.universe.dtype == np.float64
+    assert double.curve_matrix.dtype == np.float64
+
+
+def test_compute_batch_matches_compute():
+    """Test that batched inference matches scalar compute for every case."""
+    rng = np.random.default_rng(0)
+    temperatures = np.concatenate((np.arange(0, 100, 5), rng.uniform(0, 99, 50)))
+    humidities = np.concatenate((np.full(20, 50.0), rng.uniform(0, 99, 50)))
+    
+    for defuzzification in CustomFuzzyLogic.DEFUZZIFICATION_METHODS:
+        fuzzy_system = CustomFuzzyLogic(defuzzification=defuzzification)
+        
+        temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+        temp.add_term("cold", create_trapmf((0, 0, 20, 40)))
+        temp.add_term("warm", create_gaussmf(50, 10))
+        temp.add_term("hot", create_trimf((60, 80, 100)))
+        
+        humidity = fuzzy_system.create_variable("humidity", _UNIV_100)
+        humidity.add_term("dry", create_trimf((0, 0, 50)))
+        humidity.add_term("humid", create_trimf((50, 100, 100)))
+        
+        comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+        comfort.add_term("low", create_trimf((0, 2, 4)))
+        comfort.add_term("medium", create_trimf((3, 5, 7)))
+        comfort.add_term("high", create_trimf((6, 8, 10)))
+        
+        fuzzy_system.add_rule({"temperature": "cold"}, ("comfort", "low"))
+        fuzzy_system.add_rule({"temperature": "warm", "humidity": "dry"}, ("comfort", "high"))
+        fuzzy_system.add_rule({"temperature": "hot", "humidity": "humid"}, ("comfort", "medium"))
+        
+        # Generic path, then with grid lookups for the first 20 temperatures
+        for grids in (None, {"temperature": np.arange(0, 100, 5).tolist()}):
+            if grids is not None:
+                fuzzy_system.compile_specialized(["temperature", "humidity"], grids)
+            
+            batch = fuzzy_system.compute({"temperature": temperatures, "humidity": humidities})
+            expected = [
+                fuzzy_system.compute({"temperature": t, "humidity": h})["comfort"]
+                for t, h in zip(temperatures.tolist(), humidities.tolist())
+            ]
+            np.testing.assert_allclose(batch["comfort"], expected, rtol=1e-5)
+
+
+def test_rule_table():
+    """Test that rules are packed into (variable id, term id) rows."""
+    fuzzy_system = CustomFuzzyLogic()
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("cold", create_trimf((0, 20, 40)))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    humidity = fuzzy_system.create_variable("humidity", _UNIV_100)
+    humidity.add_term("dry", create_trimf((0, 0, 50)))
+    humidity.add_term("humid", create_trimf((50, 100, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("low", create_trimf((0, 2, 4)))
+    comfort.add_term("high", create_trimf((6, 8, 10)))
+    
+    assert temp["hot"].term_id == 1
+    assert humidity["dry"].term_id == 0
+    
+    fuzzy_system.add_rule({"temperature": "hot", "humidity": "humid"}, ("comfort", "low"))
+    fuzzy_system.add_rule({"humidity": "dry"}, ("comfort", "high"))
+    
+    compiled = fuzzy_system._compile()
+    assert compiled["rule_table"].dtype == np.int16
+    assert compiled["rule_table"].tolist() == [
+        [0, 1, 1, 1, 2, 0],
+        [1, 0, -1, -1, 2, 1],
+    ]
+    assert compiled["ant_idx"].tolist() == [[1, 3], [2, -1]]
+    assert compiled["cons_idx"].tolist() == [4, 5]
+    assert compiled["flat_ant"].tolist() == [1, 3, 2]
+    assert compiled["rule_offsets"].tolist() == [0, 2]
+    assert compiled["cons_slots"].tolist() == [4, 5]
+    assert compiled["cons_offsets"].tolist() == [0, 1]
+
+
+def test_weighted_average_defuzzification():
+    """Test Sugeno-style defuzzification from the term centroids."""
+    fuzzy_system = CustomFuzzyLogic(defuzzification="weighted_average")
+    
+    temp = fuzzy_system.create_variable("temperature", _UNIV_100)
+    temp.add_term("warm", create_trimf((30, 50, 70)))
+    temp.add_term("hot", create_trimf((60, 80, 100)))
+    
+    comfort = fuzzy_system.create_variable("comfort", _UNIV_10)
+    comfort.add_term("medium", create_trimf((3, 5, 7)))
+    comfort.add_term("high", create_trimf((6, 8, 10)))
+    
+    fuzzy_system.add_rule({"temperature": "warm"}, ("comfort", "medium"))
+    fuzzy_system.add_rule({"temperature": "hot"}, ("comfort", "high"))
+    
+    # warm and hot both fire at 0.25
+    medium, high = comfort.centroid_vector
+    expected = (0.25 * medium + 0.25 * high) / 0.5
+    result = fuzzy_system.compute({"temperature": 65})
+    assert np.isclose(result["comfort"], expected)
+    
+    fuzzy_system.compile_specialized(["temperature"])
+    assert fuzzy_system.compute({"temperature": 65}) == result
+    
+    with pytest.raises(ValueError, match="Unknown defuzzification method"):
+        CustomFuzzyLogic(defuzzification="bisector")
 
 
 if __name__ == "__main__":
     test_basic_fuzzy_system()
+    test_rule_added_after_compute()
+    test_compile_specialized_matches_compute()
+    test_term_replaced_after_compile_specialized()
+    test_single_full_term_uses_cached_centroid()
+    test_fuzzify_matches_terms()
+    test_variable_dtype()
+    test_compute_batch_matches_compute()
+    test_rule_table()
+    test_weighted_average_defuzzification()
     print("All tests passed!")
@@ -5,19 +5,45 @@ Tests for the fuzzy logic implementation.
 import pytest
 import numpy as np
 
-from fuzzy_news2.fuzzy_logic import FuzzyLogic, MockAntecedent, MockConsequent
-
-
-@pytest.fixture
+from fuzzy_news2.fuzzy_logic import FuzzyLogic, MockAntecedent, MockConsequent, control
+
+# Universes shared by the tests; read-only so no test can change them
+_UNIV_100 = np.arange(0, 100, 1)
+_UNIV_100.flags.writeable = False
+_UNIV_10 = np.arange(0, 10, 0.1)
+_UNIV_10.flags.writeable = False
+
+# Membership function definitions shared by the tests; never modified
+_BASE_MFS = {
+    "low": {"type": "trimf", "params": [0, 0, 50]},
+    "high": {"type": "trimf", "params": [50, 100, 100]}
+}
+_THREE_TERM_MFS = {
+    "low": {"type": "trimf", "params": [0, 0, 50]},
+    "medium": {"type": "trimf", "params": [25, 50, 75]},
+    "high": {"type": "trimf", "params": [50, 100, 100]}
+}
+_OUTPUT_MFS = {
+    "low": {"type": "trimf", "params": [0, 0, 5]},
+    "high": {"type": "trimf", "params": [5, 10, 10]}
+}
+_GAUSS_MFS = {"gaussian": {"type": "gaussmf", "params": [50, 10]}}  # mean=50, sigma=10
+_TRAP_MFS = {"trapezoid": {"type": "trapmf", "params": [20, 40, 60, 80]}}
+
+
+@pytest.fixture(scope="session")
 def fuzzy_system():
-    """Create a simple fuzzy logic system for testing."""
+    """Create a simple fuzzy logic system for testing.
+    
+    The system is built once and only read by the tests that use it.
+    """
     fl = FuzzyLogic()
     
     # Create a simple fuzzy system for testing
     # Define universes
-    temperature_universe = np.arange(0, 100, 1)
-    humidity_universe = np.arange(0, 100, 1)
-    comfort_universe = np.arange(0, 10, 0.1)
+    temperature_universe = _UNIV_100
+    humidity_universe = _UNIV_100
+    comfort_universe = _UNIV_10
     
     # Define membership functions
     temperature_mfs = {
@@ -68,16 +94,8 @@ def test_create_antecedent():
     """Test creating an antecedent variable."""
     fl = FuzzyLogic()
     
-    # Define universe and membership functions
-    universe = np.arange(0, 100, 1)
-    mfs = {
-        "low": {"type": "trimf", "params": [0, 0, 50]},
-        "medium": {"type": "trimf", "params": [25, 50, 75]},
-        "high": {"type": "trimf", "params": [50, 100, 100]}
-    }
-    
     # Create antecedent
-    antecedent = fl._create_antecedent("test", universe, mfs)
+    antecedent = fl._create_antecedent("test", _UNIV_100, _THREE_TERM_MFS)
     
     # Verify
     assert antecedent.name == "test"
@@ -91,7 +109,7 @@ def test_create_consequent():
     fl = FuzzyLogic()
     
     # Define universe and membership functions
-    universe = np.arange(0, 10, 0.1)
+    universe = _UNIV_10
     mfs = {
         "low": {"type": "trimf", "params": [0, 0, 5]},
         "medium": {"type": "trimf", "params": [3, 5, 7]},
@@ -113,18 +131,9 @@ def test_add_rule():
     fl = FuzzyLogic()
     
     # Create antecedents and consequent
-    universe = np.arange(0, 100, 1)
-    mfs = {"low": {"type": "trimf", "params": [0, 0, 50]},
-           "high": {"type": "trimf", "params": [50, 100, 100]}}
-    
-    antecedent1 = fl._create_antecedent("test1", universe, mfs)
-    antecedent2 = fl._create_antecedent("test2", universe, mfs)
-    
-    output_universe = np.arange(0, 10, 0.1)
-    output_mfs = {"low": {"type": "trimf", "params": [0, 0, 5]},
-                  "high": {"type": "trimf", "params": [5, 10, 10]}}
-    
-    consequent = fl._create_consequent("output", output_universe, output_mfs)
+    antecedent1 = fl._create_antecedent("test1", _UNIV_100, _BASE_MFS)
+    antecedent2 = fl._create_antecedent("test2", _UNIV_100, _BASE_MFS)
+    consequent = fl._create_consequent("output", _UNIV_10, _OUTPUT_MFS)
     
     # Create rule
     rule = fl._add_rule(antecedent1["low"] & antecedent2["high"], consequent["low"])
@@ -133,6 +142,34 @@ def test_add_rule():
     assert rule is not None
 
 
+def test_add_rule_direct():
+    """Test that native dict/tuple rules match the expression form."""
+    def build():
+        fl = FuzzyLogic()
+        a1 = fl._create_antecedent("test1", _UNIV_100, _BASE_MFS)
+        a2 = fl._create_antecedent("test2", _UNIV_100, _BASE_MFS)
+        c = fl._create_consequent("output", _UNIV_10, _OUTPUT_MFS)
+        return fl, a1, a2, c
+    
+    expr, a1, a2, c = build()
+    expr._add_rule(a1["low"] & a2["high"], c["low"])
+    expr._add_rule(a1["high"], c["high"])
+    
+    direct = build()[0]
+    direct.add_rule_direct({"test1": "low", "test2": "high"}, ("output", "low"))
+    direct.add_rule_direct({"test1": "high"}, ("output", "high"))
+    
+    # _add_rule routes native inputs through the direct path
+    routed = build()[0]
+    routed._add_rule({"test1": "low", "test2": "high"}, ("output", "low"))
+    routed._add_rule({"test1": "high"}, ("output", "high"))
+    
+    inputs = {"test1": 30, "test2": 70}
+    for fl in (direct, routed):
+        assert len(fl.rules) == 2
+        assert fl.compute(inputs) == expr.compute(inputs)
+
+
 def test_computation(fuzzy_system):
     """Test fuzzy system computation with different inputs."""
     # Test cold and dry scenario
@@ -163,7 +200,7 @@ def test_unsupported_mf_type():
     fl = FuzzyLogic()
     
     # Define universe and invalid membership function type
-    universe = np.arange(0, 100, 1)
+    universe = _UNIV_100
     mfs = {"invalid": {"type": "unknown_type", "params": [0, 50, 100]}}
     
     with pytest.raises(ValueError, match="Unsupported membership function type"):
@@ -174,12 +211,8 @@ def test_gaussmf():
     """Test Gaussian membership function."""
     fl = FuzzyLogic()
     
-    # Define universe and Gaussian membership function
-    universe = np.arange(0, 100, 1)
-    mfs = {"gaussian": {"type": "gaussmf", "params": [50, 10]}}  # mean=50, sigma=10
-    
-    # Create antecedent
-    antecedent = fl._create_antecedent("test", universe, mfs)
+    # Create antecedent with a Gaussian membership function
+    antecedent = fl._create_antecedent("test", _UNIV_100, _GAUSS_MFS)
     
     # Verify
     assert antecedent is not None
@@ -190,13 +223,22 @@ def test_trapmf():
     """Test trapezoidal membership function."""
     fl = FuzzyLogic()
     
-    # Define universe and trapezoidal membership function
-    universe = np.arange(0, 100, 1)
-    mfs = {"trapezoid": {"type": "trapmf", "params": [20, 40, 60, 80]}}
-    
-    # Create antecedent
-    antecedent = fl._create_antecedent("test", universe, mfs)
+    # Create antecedent with a trapezoidal membership function
+    antecedent = fl._create_antecedent("test", _UNIV_100, _TRAP_MFS)
     
     # Verify
     assert antecedent is not None
     assert "trapezoid" in antecedent.terms
+
+
+def test_mock_control_simulation():
+    """Test the skfuzzy-style mock simulation can be driven end to end."""
+    antecedent = MockAntecedent(_UNIV_100, "temperature")
+    consequent = MockConsequent(np.arange(0, 10, 1), "comfort")
+    rule = control.Rule(antecedent["cold"] & antecedent["warm"], consequent["low"])
+    
+    simulation = control.ControlSystemSimulation(control.ControlSystem([rule]))
+    simulation.set_input({"temperature": 20})
+    simulation.compute()
+    
+    assert simulation.get_output() == {"comfort": 5.0}
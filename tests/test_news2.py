@@ -2,14 +2,18 @@
 Tests for the NEWS-2 implementation.
 """
 
+import gc
+import json
+import pickle
+import weakref
+from dataclasses import replace
 import pytest
-from fuzzy_news2 import FuzzyNEWS2
+import numpy as np
+from fuzzy_news2 import FuzzyNEWS2, NEWS2Result, NEWS2Scores
 
 
-def test_crisp_score():
+def test_crisp_score(fuzzy_news):
     """Test the crisp NEWS-2 score calculation."""
-    fuzzy_news = FuzzyNEWS2()
-    
     # Test case 1: All parameters normal
     result = fuzzy_news.calculate(
         respiratory_rate=12,
@@ -53,44 +57,65 @@ def test_crisp_score():
     assert result.risk_category == "High"
 
 
-def test_consciousness_validation():
+@pytest.mark.parametrize("level,expected", [("A", 0), ("V", 3), ("P", 3), ("U", 3)])
+def test_consciousness_validation(fuzzy_news, level, expected):
     """Test validation of consciousness level."""
-    fuzzy_news = FuzzyNEWS2()
+    result = fuzzy_news.calculate(
+        respiratory_rate=12,
+        oxygen_saturation=98,
+        systolic_bp=120,
+        pulse=70,
+        consciousness=level,
+        temperature=37.0,
+        supplemental_oxygen=False
+    )
     
-    # Valid consciousness levels
-    for level in ["A", "V", "P", "U"]:
-        result = fuzzy_news.calculate(
+    assert result.parameter_scores["consciousness"] == expected
+
+
+def test_invalid_consciousness(fuzzy_news):
+    """Test that an invalid consciousness level is rejected."""
+    with pytest.raises(ValueError):
+        fuzzy_news.calculate(
             respiratory_rate=12,
             oxygen_saturation=98,
             systolic_bp=120,
             pulse=70,
-            consciousness=level,
+            consciousness="X",  # Invalid
             temperature=37.0,
             supplemental_oxygen=False
         )
-        
-        if level == "A":
-            assert result.parameter_scores["consciousness"] == 0
-        else:
-            assert result.parameter_scores["consciousness"] == 3
+
+
+def test_crisp_score_batch(fuzzy_news):
+    """Test that batch crisp scoring matches per-patient scoring."""
+    # Values on and either side of every band boundary
+    patients = [
+        (8, 91, 90, 40, "A", 35.0, False),
+        (9, 92, 91, 41, "V", 35.1, True),
+        (11, 93, 100, 50, "P", 36.0, False),
+        (12, 94, 101, 51, "U", 36.1, True),
+        (20, 95, 110, 90, "A", 38.0, False),
+        (21, 96, 111, 91, "A", 38.1, True),
+        (24, 100, 219, 110, "V", 39.0, False),
+        (25, 70, 220, 131, "A", 39.1, True),
+    ]
+    
+    scores = fuzzy_news.calculate_crisp_batch(*zip(*patients))
+    
+    for i, patient in enumerate(patients):
+        expected = fuzzy_news._calculate_crisp_score(*patient)
+        assert {name: int(values[i]) for name, values in scores.items()} == expected
     
     # Invalid consciousness level
     with pytest.raises(ValueError):
-        fuzzy_news.calculate(
-            respiratory_rate=12,
-            oxygen_saturation=98,
-            systolic_bp=120,
-            pulse=70,
-            consciousness="X",  # Invalid
-            temperature=37.0,
-            supplemental_oxygen=False
+        fuzzy_news.calculate_crisp_batch(
+            [12, 12], [98, 98], [120, 120], [70, 70], ["A", "X"], [37.0, 37.0], [False, False]
         )
 
 
-def test_fuzzy_vs_crisp():
+def test_fuzzy_vs_crisp(fuzzy_news):
     """Test the relationship between fuzzy and crisp scores."""
-    fuzzy_news = FuzzyNEWS2()
-    
     # Test cases at the boundary between risk categories
     result = fuzzy_news.calculate(
         respiratory_rate=21,  # Just above normal
@@ -110,10 +135,8 @@ def test_fuzzy_vs_crisp():
     assert abs(result.fuzzy_score - result.crisp_score) < 5.0
 
 
-def test_recommended_response():
+def test_recommended_response(fuzzy_news):
     """Test that the recommended response matches the risk category."""
-    fuzzy_news = FuzzyNEWS2()
-    
     # Low risk
     result = fuzzy_news.calculate(
         respiratory_rate=12,
@@ -141,3 +164,114 @@ def test_recommended_response():
     assert "urgent" in result.recommended_response.lower()
     assert "critical care" in result.recommended_response.lower()
 
+
+def test_parameter_scores_mapping(fuzzy_news):
+    """Test that parameter scores are packed int8 values with a dict API."""
+    scores = fuzzy_news._calculate_crisp_score(25, 92, 105, 95, "V", 38.5, True)
+    assert isinstance(scores, NEWS2Scores)
+    assert scores._arr.dtype == np.int8
+    assert scores["respiratory_rate"] == 3
+    assert scores["consciousness"] == 3
+    assert scores["total"] == 13
+    assert list(scores) == list(NEWS2Scores.KEYS)
+    assert scores.to_dict() == dict(scores)
+    assert all(type(v) is int for v in scores.to_dict().values())
+    
+    with pytest.raises(KeyError):
+        scores["heart_rate"]
+
+
+def test_calculate_cache(fuzzy_news):
+    """Test that repeated vital signs reuse the cached result."""
+    vitals = dict(
+        respiratory_rate=22,
+        oxygen_saturation=94,
+        systolic_bp=105,
+        pulse=95,
+        consciousness="A",
+        temperature=38.4,
+        supplemental_oxygen=False
+    )
+    
+    result = fuzzy_news.calculate(**vitals)
+    assert fuzzy_news.calculate(**vitals) is result
+    
+    uncached = FuzzyNEWS2(cache_size=0)
+    assert uncached.calculate(**vitals) is not uncached.calculate(**vitals)
+    assert uncached.calculate(**vitals) == result
+
+
+def test_calculate_cache_freed_with_instance():
+    """Test that a calculator and its cache are freed without the cyclic GC."""
+    for cache_size in (0, 10):
+        calculator = FuzzyNEWS2(cache_size=cache_size)
+        calculator.calculate(22, 94, 105, 95, "A", 38.4, False)
+        ref = weakref.ref(calculator)
+        
+        gc.disable()
+        try:
+            del calculator
+            assert ref() is None
+        finally:
+            gc.enable()
+
+
+def test_fuzzy_system_shared(fuzzy_news):
+    """Test that calculators share one fuzzy system per defuzzification method."""
+    assert FuzzyNEWS2().fuzzy_system is fuzzy_news.fuzzy_system
+    assert (FuzzyNEWS2(defuzzification="weighted_average").fuzzy_system
+            is not fuzzy_news.fuzzy_system)
+
+
+def test_fuzzy_fallback():
+    """Test that fuzzy errors propagate unless the crisp fallback is enabled."""
+    class BrokenSystem:
+        def compute(self, inputs):
+            raise RuntimeError("Error computing fuzzy result")
+    
+    vitals = (22, 94, 105, 95, "A", 38.4, False)
+    
+    fuzzy_news = FuzzyNEWS2(cache_size=0)
+    fuzzy_news.fuzzy_system = BrokenSystem()
+    with pytest.raises(RuntimeError):
+        fuzzy_news.calculate(*vitals)
+    
+    fuzzy_news = FuzzyNEWS2(cache_size=0, fuzzy_fallback=True)
+    fuzzy_news.fuzzy_system = BrokenSystem()
+    result = fuzzy_news.calculate(*vitals)
+    assert result.fuzzy_score == result.crisp_score
+
+
+def test_result_serialization(fuzzy_news):
+    """Test the packed and JSON forms of a result."""
+    result = fuzzy_news.calculate(22, 94, 105, 95, "A", 38.4, False)
+    
+    unpacked = NEWS2Result.PACKED_FORMAT.unpack(result.packed)
+    assert len(result.packed) == 11
+    assert list(unpacked[:7]) == list(result.parameter_scores.values())[:7]
+    assert unpacked[7] == pytest.approx(result.fuzzy_score, rel=1e-6)
+    
+    data = json.loads(result.to_json_bytes())
+    assert data == result.to_dict()
+    assert data["parameter_scores"]["total"] == result.crisp_score
+
+
+def test_result_memberships_frozen(fuzzy_news):
+    """Test that the memberships of a shared, cached result can't be changed."""
+    memberships = {"pulse": {"normal": 0.75, "high": 0.25}}
+    result = replace(fuzzy_news.calculate(22, 94, 105, 95, "A", 38.4, False),
+                     fuzzy_memberships=memberships)
+    
+    with pytest.raises(TypeError):
+        result.fuzzy_memberships["pulse"] = {}
+    with pytest.raises(TypeError):
+        result.fuzzy_memberships["pulse"]["normal"] = 1.0
+    
+    # Changing the dictionaries it was built from doesn't change it either
+    memberships["pulse"]["normal"] = 1.0
+    assert result.fuzzy_memberships["pulse"]["normal"] == 0.75
+    
+    # Results still pickle (for the API's worker processes) and serialize
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert result.to_dict()["fuzzy_memberships"] == {"pulse": {"normal": 0.75, "high": 0.25}}
+    assert b'"normal":0.75' in result.to_json_bytes().replace(b" ", b"")
@@ -4,17 +4,25 @@ Tests for the utility functions.
 
 import os
 import json
-import tempfile
 from datetime import datetime
+import numpy as np
 import pytest
 
 from fuzzy_news2.utils import (
     validate_range,
+    validate_vitals,
     validate_consciousness,
     format_result,
     save_result,
+    save_results,
+    append_assessment_log,
+    load_assessment_log,
     load_result,
-    get_patient_history
+    get_patient_history,
+    get_patient_history_arrays,
+    ASSESSMENT_LOG_CACHE_SIZE,
+    _assessment_log_cache,
+    _dumps
 )
 
 
@@ -33,6 +41,24 @@ def test_validate_range():
         validate_range(11, 0, 10, "test")
 
 
+def test_validate_vitals():
+    """Test validation of all numeric vital signs at once."""
+    # Valid values, including the range limits
+    validate_vitals(12, 98, 120, 70, 37.0)
+    validate_vitals(0, 70, 50, 20, 33.0)
+    validate_vitals(50, 100, 250, 180, 43.0)
+    
+    # Invalid values name the offending parameter
+    with pytest.raises(ValueError, match="Respiratory rate"):
+        validate_vitals(51, 98, 120, 70, 37.0)
+    
+    with pytest.raises(ValueError, match="Pulse rate"):
+        validate_vitals(12, 98, 120, 19, 37.0)
+    
+    with pytest.raises(ValueError, match="Temperature"):
+        validate_vitals(12, 98, 120, 70, 43.1)
+
+
 def test_validate_consciousness():
     """Test consciousness level validation."""
     # Valid values
@@ -55,51 +81,78 @@ def test_format_result():
     assert "key" in formatted
     assert formatted["key"] == "value"
     assert "timestamp" in formatted
+    assert abs(
+        (datetime.fromisoformat(formatted["timestamp"]) - datetime.now()).total_seconds()
+    ) < 5
     
     # Test without timestamp
     formatted = format_result(result, include_timestamp=False)
     assert "timestamp" not in formatted
 
 
-def test_save_and_load_result():
+def test_save_and_load_result(tmp_path):
     """Test saving and loading results."""
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temp_file:
-        temp_path = temp_file.name
+    temp_path = tmp_path / "result.json"
     
-    try:
-        # Prepare test data
-        result = {
-            "patient_id": "TEST-001",
-            "crisp_score": 5,
-            "fuzzy_score": 5.7,
-            "risk_category": "Medium",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Save the result
-        saved_path = save_result(result, "TEST-001", temp_path)
-        assert saved_path == temp_path
-        assert os.path.exists(saved_path)
-        
-        # Load the result
-        loaded_result = load_result(saved_path)
-        
-        # Verify the loaded result
-        assert loaded_result["patient_id"] == result["patient_id"]
-        assert loaded_result["crisp_score"] == result["crisp_score"]
-        assert loaded_result["fuzzy_score"] == result["fuzzy_score"]
-        assert loaded_result["risk_category"] == result["risk_category"]
-        assert loaded_result["timestamp"] == result["timestamp"]
+    # Prepare test data
+    result = {
+        "patient_id": "TEST-001",
+        "crisp_score": 5,
+        "fuzzy_score": 5.7,
+        "risk_category": "Medium",
+        "timestamp": datetime.now().isoformat()
+    }
     
-    finally:
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    # Save the result
+    saved_path = save_result(result, "TEST-001", temp_path)
+    assert saved_path == temp_path
+    assert os.path.exists(saved_path)
+    
+    # Load the result
+    loaded_result = load_result(saved_path)
+    
+    # Verify the loaded result
+    assert loaded_result["patient_id"] == result["patient_id"]
+    assert loaded_result["crisp_score"] == result["crisp_score"]
+    assert loaded_result["fuzzy_score"] == result["fuzzy_score"]
+    assert loaded_result["risk_category"] == result["risk_category"]
+    assert loaded_result["timestamp"] == result["timestamp"]
 
 
-def test_save_result_default_path():
+def test_save_result_stores_epoch(tmp_path):
+    """Test that saved results carry the timestamp as POSIX seconds."""
+    timestamp = datetime(2024, 1, 1, 12, 30)
+    result = {"patient_id": "TEST-001", "timestamp": timestamp.isoformat()}
+    
+    saved_path = save_result(result, "TEST-001", str(tmp_path / "r.json"))
+    loaded_result = load_result(saved_path)
+    
+    assert loaded_result["ts_epoch"] == timestamp.timestamp()
+    assert "ts_epoch" not in result
+
+
+def test_save_result_non_iso_timestamp(tmp_path):
+    """Test that results with a timestamp that isn't ISO 8601 still save."""
+    result = {"patient_id": "TEST-010", "crisp_score": 1, "fuzzy_score": 1.5,
+              "timestamp": "01/02/2024 12:30"}
+    
+    saved_path = save_result(result, "TEST-010", str(tmp_path / "TEST-010_0.json"))
+    assert load_result(saved_path) == result
+    
+    # Statistics columns and the assessment log skip the unknown time
+    arrays = get_patient_history_arrays("TEST-010", str(tmp_path))
+    assert arrays["crisp_score"].tolist() == [1]
+    assert np.isnan(arrays["timestamp"][0])
+    
+    append_assessment_log([result], "TEST-010", str(tmp_path))
+    assert np.isnan(load_assessment_log("TEST-010", str(tmp_path))["ts"]).all()
+
+
+def test_save_result_default_path(tmp_path, monkeypatch):
     """Test saving a result with default path."""
+    # The default data directory is under the working directory
+    monkeypatch.chdir(tmp_path)
+    
     # Prepare test data
     result = {
         "patient_id": "TEST-002",
@@ -112,77 +165,219 @@ def test_save_result_default_path():
     # Save the result with default path
     saved_path = save_result(result, "TEST-002")
     
-    try:
-        # Verify the file exists
-        assert os.path.exists(saved_path)
-        
-        # Verify the file is in the data directory
-        assert os.path.dirname(saved_path).endswith("data")
-        
-        # Verify the filename contains the patient ID
-        assert "TEST-002" in os.path.basename(saved_path)
-        
-        # Load the result
-        loaded_result = load_result(saved_path)
-        
-        # Verify the loaded result
-        assert loaded_result["patient_id"] == result["patient_id"]
+    # Verify the file exists
+    assert os.path.exists(saved_path)
+    
+    # Verify the file is in the data directory
+    assert os.path.dirname(saved_path) == str(tmp_path / "data")
+    
+    # Verify the filename contains the patient ID
+    assert "TEST-002" in os.path.basename(saved_path)
+    
+    # Load the result
+    loaded_result = load_result(saved_path)
     
-    finally:
-        # Clean up
-        if os.path.exists(saved_path):
-            os.remove(saved_path)
+    # Verify the loaded result
+    assert loaded_result["patient_id"] == result["patient_id"]
 
 
-def test_get_patient_history():
+def test_save_result_default_path_unique(tmp_path, monkeypatch):
+    """Test that results saved in the same second don't overwrite each other."""
+    monkeypatch.chdir(tmp_path)
+    result = {"patient_id": "TEST-008", "crisp_score": 1, "fuzzy_score": 1.0,
+              "timestamp": datetime.now().isoformat()}
+    
+    saved_paths = {save_result(result, "TEST-008") for _ in range(5)}
+    
+    assert len(saved_paths) == 5
+    assert len(get_patient_history("TEST-008")) == 5
+
+
+def test_get_patient_history(tmp_path):
     """Test retrieving patient history."""
-    # Create a temporary directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create some test files
-        for i in range(5):
-            result = {
-                "patient_id": "TEST-003",
-                "crisp_score": i,
-                "fuzzy_score": float(i) + 0.5,
-                "risk_category": "Low" if i < 3 else "Medium",
-                "timestamp": (datetime.now().isoformat()[:-6] + 
-                             f"{i:03}000")  # Make timestamps predictably ordered
-            }
-            
-            file_path = os.path.join(temp_dir, f"TEST-003_{i}.json")
-            with open(file_path, "w") as f:
-                json.dump(result, f)
-        
-        # Also create a file for a different patient
-        other_result = {
-            "patient_id": "OTHER",
-            "crisp_score": 0,
-            "timestamp": datetime.now().isoformat()
+    # Create some test files
+    for i in range(5):
+        result = {
+            "patient_id": "TEST-003",
+            "crisp_score": i,
+            "fuzzy_score": float(i) + 0.5,
+            "risk_category": "Low" if i < 3 else "Medium",
+            "timestamp": (datetime.now().isoformat()[:-6] + 
+                         f"{i:03}000")  # Make timestamps predictably ordered
+        }
+        (tmp_path / f"TEST-003_{i}.json").write_bytes(_dumps(result))
+    
+    # Also create a file for a different patient
+    other_result = {
+        "patient_id": "OTHER",
+        "crisp_score": 0,
+        "timestamp": datetime.now().isoformat()
+    }
+    (tmp_path / "OTHER_0.json").write_bytes(_dumps(other_result))
+    
+    # Get history for TEST-003
+    history = get_patient_history("TEST-003", str(tmp_path))
+    
+    # Verify the history
+    assert len(history) == 5
+    assert all(item["patient_id"] == "TEST-003" for item in history)
+    
+    # Verify the history is sorted by timestamp (newest first)
+    timestamps = [item["timestamp"] for item in history]
+    assert timestamps == sorted(timestamps, reverse=True)
+    
+    # Get history for OTHER
+    other_history = get_patient_history("OTHER", str(tmp_path))
+    assert len(other_history) == 1
+    assert other_history[0]["patient_id"] == "OTHER"
+    
+    # Get history for non-existent patient
+    nonexistent_history = get_patient_history("NONEXISTENT", str(tmp_path))
+    assert len(nonexistent_history) == 0
+
+
+def test_save_results_batch_history(tmp_path):
+    """Test that batch-saved results appear in patient history."""
+    results = [
+        {"patient_id": "TEST-005", "crisp_score": i,
+         "timestamp": datetime(2024, 1, i + 1).isoformat()}
+        for i in range(3)
+    ]
+    
+    file_path = str(tmp_path / "TEST-005_batch.json")
+    assert save_results(results, "TEST-005", file_path) == file_path
+    
+    history = get_patient_history("TEST-005", str(tmp_path))
+    assert [item["crisp_score"] for item in history] == [2, 1, 0]
+
+
+def test_get_patient_history_index(tmp_path):
+    """Test that saved results are found through the history index."""
+    # A file from before the patient had an index
+    with open(tmp_path / "TEST-007_old.json", "w") as f:
+        json.dump({"crisp_score": 0, "timestamp": datetime(2024, 1, 1).isoformat()}, f)
+    
+    for i in (1, 2):
+        result = {"crisp_score": i, "timestamp": datetime(2024, 1, i + 1).isoformat()}
+        save_result(result, "TEST-007", str(tmp_path / f"TEST-007_{i}.json"))
+    
+    index_path = tmp_path / ".idx" / "TEST-007.jsonl"
+    assert index_path.exists()
+    
+    history = get_patient_history("TEST-007", str(tmp_path))
+    assert [item["crisp_score"] for item in history] == [2, 1, 0]
+    
+    # Overwriting a file indexes it again but doesn't duplicate it, and
+    # removed files are skipped
+    save_result({"crisp_score": 3, "timestamp": datetime(2024, 1, 4).isoformat()},
+                "TEST-007", str(tmp_path / "TEST-007_1.json"))
+    (tmp_path / "TEST-007_old.json").unlink()
+    
+    history = get_patient_history("TEST-007", str(tmp_path))
+    assert [item["crisp_score"] for item in history] == [3, 2]
+
+
+def test_get_patient_history_arrays(tmp_path):
+    """Test retrieving patient history as NumPy columns."""
+    for i in range(3):
+        result = {
+            "patient_id": "TEST-004",
+            "crisp_score": i,
+            "fuzzy_score": float(i) + 0.5,
+            "timestamp": datetime(2024, 1, i + 1, 12, 0).isoformat()
         }
         
-        other_path = os.path.join(temp_dir, "OTHER_0.json")
-        with open(other_path, "w") as f:
-            json.dump(other_result, f)
-        
-        # Get history for TEST-003
-        history = get_patient_history("TEST-003", temp_dir)
-        
-        # Verify the history
-        assert len(history) == 5
-        assert all(item["patient_id"] == "TEST-003" for item in history)
-        
-        # Verify the history is sorted by timestamp (newest first)
-        timestamps = [item["timestamp"] for item in history]
-        assert timestamps == sorted(timestamps, reverse=True)
-        
-        # Get history for OTHER
-        other_history = get_patient_history("OTHER", temp_dir)
-        assert len(other_history) == 1
-        assert other_history[0]["patient_id"] == "OTHER"
-        
-        # Get history for non-existent patient
-        nonexistent_history = get_patient_history("NONEXISTENT", temp_dir)
-        assert len(nonexistent_history) == 0
+        with open(tmp_path / f"TEST-004_{i}.json", "w") as f:
+            json.dump(result, f)
+    
+    arrays = get_patient_history_arrays("TEST-004", str(tmp_path))
+    
+    # Newest first, like get_patient_history
+    assert arrays["crisp_score"].tolist() == [2, 1, 0]
+    assert arrays["fuzzy_score"].tolist() == [2.5, 1.5, 0.5]
+    assert arrays["timestamp"][0] == datetime(2024, 1, 3, 12, 0).timestamp()
+    
+    # Non-existent patient gives empty columns
+    empty = get_patient_history_arrays("NONEXISTENT", str(tmp_path))
+    assert empty["crisp_score"].size == 0
+    assert empty["timestamp"].size == 0
+
+
+def test_assessment_log(tmp_path):
+    """Test appending to and reading the binary assessment log."""
+    assert load_assessment_log("TEST-006", str(tmp_path)) is None
+    
+    results = [
+        {
+            "patient_id": "TEST-006",
+            "timestamp": datetime(2024, 1, i + 1).isoformat(),
+            "crisp_score": i,
+            "fuzzy_score": i + 0.25,
+            "risk_category": "Medium",
+            "parameter_scores": {"respiratory_rate": 1, "total": i}
+        }
+        for i in range(3)
+    ]
+    append_assessment_log(results[:2], "TEST-006", str(tmp_path))
+    append_assessment_log(results[2:], "TEST-006", str(tmp_path))
+    
+    log = load_assessment_log("TEST-006", str(tmp_path))
+    assert log["crisp"].tolist() == [0, 1, 2]
+    assert log["fuzzy"].tolist() == [0.25, 1.25, 2.25]
+    assert log["ts"][0] == datetime(2024, 1, 1).timestamp()
+    assert log["risk"].tolist() == [2, 2, 2]
+    assert log["params"][2].tolist() == [1, -1, -1, -1, -1, -1, -1, 2]
+    
+    # Unchanged logs are served from the cache; appends are picked up
+    assert load_assessment_log("TEST-006", str(tmp_path)) is log
+    append_assessment_log(results[:1], "TEST-006", str(tmp_path))
+    assert len(load_assessment_log("TEST-006", str(tmp_path))) == 4
+    
+    # Statistics columns come from the log, newest first
+    arrays = get_patient_history_arrays("TEST-006", str(tmp_path))
+    assert arrays["crisp_score"].tolist() == [2, 1, 0, 0]
+
+
+def test_assessment_log_cache_bounded(tmp_path):
+    """Test that only a bounded number of assessment logs stay mapped."""
+    result = {"timestamp": datetime(2024, 1, 1).isoformat(), "crisp_score": 1, "fuzzy_score": 1.5}
+    for i in range(ASSESSMENT_LOG_CACHE_SIZE + 5):
+        append_assessment_log([result], f"TEST-CACHE-{i}", str(tmp_path))
+        assert len(load_assessment_log(f"TEST-CACHE-{i}", str(tmp_path))) == 1
+    
+    assert len(_assessment_log_cache) == ASSESSMENT_LOG_CACHE_SIZE
+
+
+def test_assessment_log_backfill(tmp_path):
+    """Test that a new assessment log includes the existing JSON history."""
+    results = [
+        {
+            "patient_id": "TEST-009",
+            "timestamp": datetime(2024, 1, i + 1).isoformat(),
+            "crisp_score": i,
+            "fuzzy_score": i + 0.5,
+            "risk_category": "Low"
+        }
+        for i in range(4)
+    ]
+    for i, result in enumerate(results[:3]):
+        save_result(result, "TEST-009", str(tmp_path / f"TEST-009_{i}.json"))
+    
+    # The latest result is saved as JSON before it is logged, as in the API
+    save_result(results[3], "TEST-009", str(tmp_path / "TEST-009_3.json"))
+    append_assessment_log(results[3:], "TEST-009", str(tmp_path))
+    
+    log = load_assessment_log("TEST-009", str(tmp_path))
+    assert log["crisp"].tolist() == [0, 1, 2, 3]
+    
+    # Statistics and history agree
+    arrays = get_patient_history_arrays("TEST-009", str(tmp_path))
+    history = get_patient_history("TEST-009", str(tmp_path))
+    assert arrays["crisp_score"].tolist() == [h["crisp_score"] for h in history]
+    
+    # Only the first append backfills
+    append_assessment_log(results[:1], "TEST-009", str(tmp_path))
+    assert len(load_assessment_log("TEST-009", str(tmp_path))) == 5
 
 
 def test_get_patient_history_nonexistent_directory():
@@ -198,18 +393,11 @@ def test_load_result_nonexistent_file():
         load_result("/nonexistent/file.json")
 
 
-def test_load_result_invalid_json():
+def test_load_result_invalid_json(tmp_path):
     """Test loading an invalid JSON file."""
     # Create a temporary file with invalid JSON
-    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temp_file:
-        temp_file.write(b"invalid json")
-        temp_path = temp_file.name
-    
-    try:
-        with pytest.raises(json.JSONDecodeError):
-            load_result(temp_path)
-    
-    finally:
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    temp_path = tmp_path / "result.json"
+    temp_path.write_bytes(b"invalid json")
+    
+    with pytest.raises(json.JSONDecodeError):
+        load_result(temp_path)